@@ -0,0 +1,180 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from api.metrics import record_cache_lookup
+from backend.constants import (
+    AUTH_TOKEN_CACHE_TIMEOUT,
+    AUTH_TOKEN_LOCAL_CACHE_SIZE,
+    AUTH_TOKEN_LOCAL_CACHE_TIMEOUT,
+    AUTH_TOKEN_TOMBSTONE_TIMEOUT,
+)
+from users.models import User
+
+TOKEN_USER_KEY = "auth-token:{}"
+USER_TOKEN_KEY = "auth-token-of:{}"
+# Метка отозванного токена или изменённого пользователя в общем кэше.
+TOMBSTONE = "revoked"
+# Поля пользователя в общем кэше: без пароля и счётчиков.
+CACHED_USER_FIELDS = (
+    "id",
+    "email",
+    "username",
+    "first_name",
+    "last_name",
+    "avatar",
+    "avatar_variants",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+)
+
+
+class LocalTokenCache:
+    """
+    Ограниченный по размеру LRU токенов внутри процесса.
+
+    Записи живут не дольше timeout: удаление токена в другом процессе
+    до этого кэша не доходит, поэтому срок жизни ограничивает время,
+    в течение которого отозванный токен ещё принимается.
+    Наружу отдаются копии пользователей, чтобы изменения request.user
+    в одном запросе не попадали в другие.
+    """
+
+    def __init__(self, size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            user, expires = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return copy.copy(user)
+
+    def set(self, key, user):
+        with self._lock:
+            self._entries[key] = (
+                copy.copy(user), time.monotonic() + self.timeout
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key=None, user_id=None):
+        with self._lock:
+            for cached_key, (user, _) in list(self._entries.items()):
+                if cached_key == key or user.pk == user_id:
+                    del self._entries[cached_key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = LocalTokenCache(
+    AUTH_TOKEN_LOCAL_CACHE_SIZE, AUTH_TOKEN_LOCAL_CACHE_TIMEOUT
+)
+
+
+def dump_user(user):
+    """Поля пользователя для общего кэша."""
+    values = {name: getattr(user, name) for name in CACHED_USER_FIELDS}
+    values["avatar"] = user.avatar.name
+    return values
+
+
+def load_user(values):
+    """Пользователь из общего кэша, остальные поля отложены."""
+    names = [
+        field.attname for field in User._meta.concrete_fields
+        if field.attname in values
+    ]
+    return User.from_db(
+        User.objects.db, names, [values[name] for name in names]
+    )
+
+
+def forget_token(key=None, user_id=None):
+    """
+    Отзыв токена или всех токенов пользователя в кэшах.
+
+    Вместо удаления в общий кэш пишутся метки: запрос, прочитавший
+    базу до отзыва, не сможет записать туда устаревшие данные.
+    """
+    keys = []
+    if user_id is not None:
+        keys.append(USER_TOKEN_KEY.format(user_id))
+        if key is None:
+            key = cache.get(USER_TOKEN_KEY.format(user_id))
+            if key == TOMBSTONE:
+                key = None
+    if key is not None:
+        keys.append(TOKEN_USER_KEY.format(key))
+    cache.set_many(
+        dict.fromkeys(keys, TOMBSTONE), AUTH_TOKEN_TOMBSTONE_TIMEOUT
+    )
+    token_cache.delete(key, user_id)
+
+
+def remember_token(key, user):
+    """
+    Запись токена в общий кэш, если его не отозвали после чтения базы.
+
+    cache.add не перезаписывает метки forget_token. Сначала
+    записывается токен пользователя, чтобы отзыв всех токенов
+    пользователя нашёл и этот.
+    """
+    user_key = USER_TOKEN_KEY.format(user.pk)
+    if not cache.add(user_key, key, AUTH_TOKEN_CACHE_TIMEOUT) and (
+        cache.get(user_key) != key
+    ):
+        return
+    cache.add(
+        TOKEN_USER_KEY.format(key), dump_user(user), AUTH_TOKEN_CACHE_TIMEOUT
+    )
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Аутентификация по токену без обращения к базе в частом случае.
+
+    Пользователь ищется сначала в LRU процесса, затем в общем кэше
+    и только потом в базе. Записи отзываются сигналами при удалении
+    токена и при сохранении или удалении пользователя.
+
+    Общий кэш у всех сервисов один (REQUIRE_SHARED_CACHE), поэтому
+    отзыв записи в нём видят все процессы сразу. Отозванный токен
+    принимается только другими процессами, уже запомнившими его в своём
+    LRU, и не дольше AUTH_TOKEN_LOCAL_CACHE_TIMEOUT секунд.
+    В общем кэше хранятся только CACHED_USER_FIELDS, остальные поля
+    пользователя загружаются из базы при первом обращении.
+    """
+
+    def authenticate_credentials(self, key):
+        user = token_cache.get(key)
+        record_cache_lookup("auth_token_local", user is not None)
+        if user is None:
+            values = cache.get(TOKEN_USER_KEY.format(key))
+            if values == TOMBSTONE:
+                values = None
+            record_cache_lookup("auth_token", values is not None)
+            if values is None:
+                user, token = super().authenticate_credentials(key)
+                remember_token(key, user)
+            else:
+                user = load_user(values)
+            token_cache.set(key, user)
+        return user, Token(key=key, user=user)
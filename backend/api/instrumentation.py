@@ -0,0 +1,137 @@
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_timings = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """Замеры одного запроса: SQL-запросы и именованные отрезки времени."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql = 0.0
+        self.spans = {}
+
+    def add(self, name, duration):
+        self.spans[name] = self.spans.get(name, 0.0) + duration
+
+
+def get_request_timings():
+    """Замеры текущего запроса или None, если он не попал в выборку."""
+    return _timings.get()
+
+
+@contextmanager
+def timed(name):
+    """Учёт времени выполнения блока в замерах текущего запроса."""
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+
+def record_query(execute, sql, params, many, context):
+    """Обёртка соединения, учитывающая запросы в замерах запроса."""
+    timings = _timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.sql += time.perf_counter() - start
+
+
+def _milliseconds(seconds):
+    return round(seconds * 1000, 2)
+
+
+class ServerTimingMiddleware:
+    """
+    Замеры времени запроса в заголовке Server-Timing и в логе.
+
+    Запросы к базе данных считаются всегда, чтобы их видели метрики,
+    а заголовок и строка лога выводятся только для доли запросов
+    SERVER_TIMING_SAMPLE_RATE.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            total = time.perf_counter() - start
+            _timings.reset(token)
+        return self.finish(request, response, timings, total)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            total = time.perf_counter() - start
+            _timings.reset(token)
+        return self.finish(request, response, timings, total)
+
+    def finish(self, request, response, timings, total):
+        if random.random() < settings.SERVER_TIMING_SAMPLE_RATE:
+            response["Server-Timing"] = self.header(timings, total)
+            self.log(request, response, timings, total)
+        return response
+
+    def header(self, timings, total):
+        metrics = [
+            f'db;dur={_milliseconds(timings.sql)};'
+            f'desc="{timings.queries} queries"'
+        ]
+        metrics.extend(
+            f"{name};dur={_milliseconds(duration)}"
+            for name, duration in timings.spans.items()
+        )
+        metrics.append(f"total;dur={_milliseconds(total)}")
+        return ", ".join(metrics)
+
+    def log(self, request, response, timings, total):
+        match = request.resolver_match
+        logger.info(json.dumps({
+            "method": request.method,
+            "path": request.path,
+            "route": match.view_name if match else None,
+            "status": response.status_code,
+            "queries": timings.queries,
+            "db_ms": _milliseconds(timings.sql),
+            **{
+                f"{name}_ms": _milliseconds(duration)
+                for name, duration in timings.spans.items()
+            },
+            "total_ms": _milliseconds(total),
+        }, ensure_ascii=False))
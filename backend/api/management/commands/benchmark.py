@@ -0,0 +1,250 @@
+import json
+import math
+import os
+import platform
+import tempfile
+import time
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import (
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.slow_queries import explain, normalize_sql
+from foodgram.datagen import generate_dataset
+from foodgram.models import Ingredient, Recipe, Tag
+from users.models import User
+
+
+# Отдельный кэш, чтобы не задеть и не использовать кэш работающего сайта.
+BENCHMARK_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "benchmark",
+    }
+}
+
+
+def _percentile(values, fraction):
+    return values[max(math.ceil(fraction * len(values)) - 1, 0)]
+
+
+def endpoints():
+    """Проверяемые адреса API для только что созданных данных."""
+    user = (
+        User.objects.annotate(carts=Count("shopping_carts"))
+        .order_by("-carts", "pk").first()
+    )
+    author = User.objects.order_by("-followers_count", "pk").first()
+    recipe = Recipe.objects.order_by("-favorites_count", "pk").first()
+    tag = Tag.objects.order_by("pk").first()
+    prefix = Ingredient.objects.order_by("pk").first().name[:3]
+    return user, {
+        "recipes-list": "/api/recipes/",
+        "recipes-list-filtered": (
+            f"/api/recipes/?tags={tag.slug}&is_favorited=1"
+            f"&author={author.pk}"
+        ),
+        "recipes-detail": f"/api/recipes/{recipe.pk}/",
+        "users-subscriptions": "/api/users/subscriptions/?recipes_limit=3",
+        "ingredients-search": f"/api/ingredients/?name={prefix}",
+        "recipes-download-shopping-cart": (
+            "/api/recipes/download_shopping_cart/"
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark key API endpoints on generated datasets of several "
+        "sizes in a throwaway test database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=[100, 1000],
+            help="Dataset sizes as numbers of users.",
+        )
+        parser.add_argument(
+            "--requests", type=int, default=200,
+            help="Measured requests per endpoint.",
+        )
+        parser.add_argument(
+            "--warmup", type=int, default=10,
+            help="Unmeasured requests per endpoint before measuring.",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0,
+            help="Random seed of the generated datasets.",
+        )
+        parser.add_argument(
+            "--label", default="",
+            help="Free-form label stored with the results, e.g. a release.",
+        )
+        parser.add_argument(
+            "--output", default="benchmark.json",
+            help="JSON file to write the results to.",
+        )
+        parser.add_argument(
+            "--compare",
+            help="Earlier results file to print p95 changes against.",
+        )
+        parser.add_argument(
+            "--explain", action="store_true",
+            help="Store and print the query plans of every endpoint.",
+        )
+
+    def handle(self, **options):
+        baseline = None
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as baseline_file:
+                baseline = json.load(baseline_file)
+        results = []
+        setup_test_environment()
+        try:
+            with tempfile.TemporaryDirectory() as media_root, (
+                override_settings(
+                    CACHES=BENCHMARK_CACHES,
+                    MEDIA_ROOT=media_root,
+                    SERVER_TIMING_SAMPLE_RATE=0,
+                )
+            ):
+                for size in options["sizes"]:
+                    results.extend(self.run_size(size, options))
+        finally:
+            teardown_test_environment()
+
+        report = {
+            "label": options["label"],
+            "created_at": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "requests": options["requests"],
+            "results": results,
+        }
+        with open(options["output"], "w", encoding="utf-8") as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f"Results written to {options['output']}"
+        ))
+        if baseline is not None:
+            self.compare(results, baseline, options["compare"])
+
+    def run_size(self, size, options):
+        test_settings = connection.settings_dict["TEST"]
+        test_name = test_settings["NAME"]
+        if connection.vendor == "sqlite":
+            # База в памяти не удаляется между размерами, поэтому файл.
+            test_settings["NAME"] = os.path.join(
+                settings.MEDIA_ROOT, "benchmark.sqlite3"
+            )
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            cache.clear()
+            start = time.perf_counter()
+            generate_dataset(size, seed=options["seed"])
+            self.stdout.write(
+                f"{size} users generated in "
+                f"{time.perf_counter() - start:.1f}s"
+            )
+            user, urls = endpoints()
+            client = APIClient()
+            client.credentials(
+                HTTP_AUTHORIZATION=(
+                    f"Token {Token.objects.create(user=user).key}"
+                )
+            )
+            return [
+                self.measure(client, size, name, url, options)
+                for name, url in urls.items()
+            ]
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            test_settings["NAME"] = test_name
+
+    def measure(self, client, size, name, url, options):
+        for _ in range(options["warmup"]):
+            response = client.get(url)
+            if response.status_code != 200:
+                raise CommandError(
+                    f"{url} ответил {response.status_code}."
+                )
+        queries = []
+
+        def count_query(execute, sql, params, many, context):
+            queries.append((sql, params, many))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_query):
+            client.get(url)
+        plans = None
+        if options["explain"]:
+            plans = [
+                {
+                    "query": normalize_sql(sql),
+                    "plan": explain(connection, sql, params),
+                }
+                for sql, params, many in queries
+                if not many and sql.lstrip().upper().startswith("SELECT")
+            ]
+        durations = []
+        start = time.perf_counter()
+        for _ in range(options["requests"]):
+            request_start = time.perf_counter()
+            client.get(url)
+            durations.append(time.perf_counter() - request_start)
+        elapsed = time.perf_counter() - start
+        durations.sort()
+        result = {
+            "size": size,
+            "endpoint": name,
+            "url": url,
+            "queries": len(queries),
+            "throughput_rps": round(len(durations) / elapsed, 1),
+            "mean_ms": round(sum(durations) / len(durations) * 1000, 2),
+            "p50_ms": round(_percentile(durations, 0.50) * 1000, 2),
+            "p95_ms": round(_percentile(durations, 0.95) * 1000, 2),
+            "p99_ms": round(_percentile(durations, 0.99) * 1000, 2),
+        }
+        self.stdout.write(
+            f"{size:>8} {name:<32} {result['throughput_rps']:>8} rps "
+            f"p50={result['p50_ms']}ms p95={result['p95_ms']}ms "
+            f"p99={result['p99_ms']}ms queries={result['queries']}"
+        )
+        if plans is not None:
+            result["plans"] = plans
+            for entry in plans:
+                self.stdout.write(f"  {entry['query']}")
+                for line in (entry["plan"] or "-").splitlines():
+                    self.stdout.write(f"    {line}")
+        return result
+
+    def compare(self, results, baseline, path):
+        baseline = {
+            (row["size"], row["endpoint"]): row
+            for row in baseline["results"]
+        }
+        self.stdout.write(f"p95 compared to {path}:")
+        for row in results:
+            before = baseline.get((row["size"], row["endpoint"]))
+            if before is None or not before["p95_ms"]:
+                continue
+            change = (row["p95_ms"] / before["p95_ms"] - 1) * 100
+            style = self.style.ERROR if change > 10 else self.style.SUCCESS
+            self.stdout.write(style(
+                f"{row['size']:>8} {row['endpoint']:<32} "
+                f"{before['p95_ms']}ms -> {row['p95_ms']}ms ({change:+.1f}%)"
+            ))
@@ -0,0 +1,334 @@
+import base64
+import io
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import (
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.urls import URLPattern, URLResolver, get_resolver
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.authentication import token_cache
+from api.v1.query_budgets import QUERY_BUDGETS
+from api.v1.urls import router_v_1
+from foodgram.datagen import generate_dataset
+from foodgram.models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+    ShoppingCartExport,
+    Tag,
+)
+from users.models import Subscriptions, User
+
+PASSWORD = "Budget-password-1"
+CHECKED_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "query-budgets",
+    }
+}
+IGNORED_ROUTES = {"api-root", "redoc"}
+
+
+def _image():
+    buffer = io.BytesIO()
+    Image.new("RGB", (32, 32), (90, 160, 90)).save(buffer, "PNG")
+    return "data:image/png;base64," + base64.b64encode(
+        buffer.getvalue()
+    ).decode()
+
+
+def route_methods():
+    """Методы каждого именованного маршрута проекта."""
+    routes = {}
+
+    def walk(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                if pattern.app_name != "admin":
+                    walk(pattern.url_patterns)
+            elif isinstance(pattern, URLPattern) and pattern.name and (
+                pattern.name not in IGNORED_ROUTES
+            ):
+                actions = getattr(pattern.callback, "actions", None)
+                if actions is not None:
+                    view_class = pattern.callback.cls
+                    # HEAD обслуживается методом get, DRF добавляет его
+                    # в actions при первом запросе.
+                    methods = {
+                        method for method in actions
+                        if method in view_class.http_method_names
+                        and method != "head"
+                    }
+                else:
+                    methods = set()
+                routes.setdefault(pattern.name, set()).update(methods)
+
+    walk(get_resolver().url_patterns)
+    return routes
+
+
+def count_objects(response):
+    """Число JSON-объектов в ответе на любой глубине."""
+    if "json" not in response.get("Content-Type", ""):
+        return 0
+
+    def walk(value):
+        if isinstance(value, dict):
+            return 1 + sum(walk(item) for item in value.values())
+        if isinstance(value, list):
+            return sum(walk(item) for item in value)
+        return 0
+
+    return walk(json.loads(response.content or b"null"))
+
+
+def build_fixture(scale):
+    """
+    Данные для проверки, объём которых растёт вместе с scale.
+
+    Поверх случайных данных создаётся пользователь с собственными
+    рецептами, подписками, избранным и списком покупок, от имени
+    которого выполняются запросы.
+    """
+    # При scale=1 пользователей меньше страницы, и N+1 в списках
+    # проявляется ростом числа запросов, а не только превышением бюджета.
+    generate_dataset(
+        3 * scale + 1,
+        recipes_per_user=2 * scale,
+        ingredients_per_recipe=5,
+        tags=4,
+        ingredients=20 * scale,
+        follows_per_user=2 * scale,
+        favorites_per_user=3 * scale,
+        carts_per_user=2 * scale,
+    )
+    user = User.objects.create_user(
+        username="budget",
+        email="budget@example.com",
+        password=PASSWORD,
+        first_name="Бюджет",
+        last_name="Проверка",
+    )
+    authors = list(User.objects.exclude(pk=user.pk).order_by("pk"))
+    followed, stranger = authors[:2 * scale], authors[-1]
+    Subscriptions.objects.bulk_create(
+        Subscriptions(user=user, following=author) for author in followed
+    )
+    recipes = list(
+        Recipe.objects.exclude(author=user).order_by("pk")[:8 * scale]
+    )
+    saved, fresh = recipes[:6 * scale], recipes[6 * scale:]
+    Favorite.objects.bulk_create(
+        Favorite(user=user, recipe=recipe) for recipe in saved
+    )
+    ShoppingCart.objects.bulk_create(
+        ShoppingCart(user=user, recipe=recipe) for recipe in saved
+    )
+    ingredients = list(Ingredient.objects.order_by("pk")[:5])
+    tags = list(Tag.objects.order_by("pk"))
+    image = saved[0].image.name
+    for number in range(2 * scale):
+        recipe = Recipe.objects.create(
+            author=user,
+            name=f"Свой рецепт {number}",
+            text="Описание",
+            image=image,
+            image_variants={"source": image},
+            cooking_time=15,
+        )
+        recipe.tags.set(tags[:2])
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(recipe=recipe, ingredients=ingredient, amount=3)
+            for ingredient in ingredients
+        )
+    export = ShoppingCartExport.objects.create(
+        user=user, status=ShoppingCartExport.DONE
+    )
+    export.file.save("export.pdf", ContentFile(b"%PDF-1.4"))
+    return user, {
+        "user": user.pk,
+        "author": followed[0].pk,
+        "stranger": stranger.pk,
+        "recipe": recipe.pk,
+        "other_recipe": saved[0].pk,
+        "fresh_recipe": fresh[0].pk,
+        "saved_recipes": [recipe.pk for recipe in saved],
+        "fresh_recipes": [recipe.pk for recipe in fresh],
+        "tag": tags[0].pk,
+        "tag_slug": tags[0].slug,
+        "ingredient": ingredients[0].pk,
+        "ingredient_prefix": ingredients[0].name[:2],
+        "export": export.pk,
+        "short_code": saved[0].short_url.strip("/"),
+        "email": user.email,
+        "password": PASSWORD,
+        "image": _image(),
+    }
+
+
+def coverage_problems():
+    """Маршруты router_v_1 и методы, для которых нет бюджета."""
+    declared = {}
+    for budget in QUERY_BUDGETS:
+        declared.setdefault(budget.route, set()).add(budget.method)
+    routes = route_methods()
+    router_routes = {
+        url.name for url in router_v_1.urls
+        if url.name not in IGNORED_ROUTES
+    }
+    problems = []
+    for route in sorted(router_routes):
+        missing = routes[route] - declared.get(route, set())
+        if missing:
+            problems.append(
+                f"{route}: нет бюджета для {', '.join(sorted(missing))}"
+            )
+    for route in sorted(set(declared) - set(routes)):
+        problems.append(f"{route}: такого маршрута нет")
+    return problems
+
+
+def run_budget(budget, context, token):
+    """
+    Запрос бюджета в откатываемой транзакции.
+
+    Возвращает число SQL-запросов, число объектов и статус ответа.
+    """
+    client = APIClient(raise_request_exception=False)
+    if budget.auth:
+        client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+    data = budget.data(context) if budget.data else None
+    queries = []
+
+    def count_query(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    cache.clear()
+    token_cache.clear()
+    with transaction.atomic():
+        with connection.execute_wrapper(count_query):
+            response = getattr(client, budget.method)(
+                budget.path.format(**context), data, format="json"
+            )
+        transaction.set_rollback(True)
+    # Точки сохранения транзакции проверки в бюджет не входят.
+    queries = [sql for sql in queries if "SAVEPOINT" not in sql.upper()]
+    return len(queries), count_objects(response), response.status_code
+
+
+def budget_errors(budget, results):
+    """Нарушения бюджета по результатам run_budget на разных данных."""
+    queries = [result[0] for result in results]
+    objects = max(result[1] for result in results)
+    statuses = {result[2] for result in results}
+    errors = []
+    if statuses != {budget.status}:
+        errors.append(f"status {sorted(statuses)} != {budget.status}")
+    if max(queries) > budget.queries:
+        errors.append(f"{max(queries)} queries > budget {budget.queries}")
+    if queries != sorted(queries) or queries[0] != queries[-1]:
+        errors.append("query count grows with data")
+    if objects > budget.objects:
+        errors.append(f"{objects} objects > budget {budget.objects}")
+    return errors
+
+
+class Command(BaseCommand):
+    help = (
+        "Check SQL query and serialized object budgets of every API route "
+        "on fixtures of growing size"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scales", type=int, nargs="+", default=[1, 3],
+            help="Fixture size multipliers, at least two.",
+        )
+        parser.add_argument(
+            "--route", action="append", default=[],
+            help="Only check these route names.",
+        )
+
+    def handle(self, **options):
+        if len(options["scales"]) < 2:
+            raise CommandError("Нужно хотя бы два размера данных.")
+        problems = coverage_problems()
+        for problem in problems:
+            self.stdout.write(self.style.ERROR(problem))
+        budgets = [
+            budget for budget in QUERY_BUDGETS
+            if not options["route"] or budget.route in options["route"]
+        ]
+        counts = {}
+        setup_test_environment()
+        try:
+            with tempfile.TemporaryDirectory() as media_root, (
+                override_settings(
+                    CACHES=CHECKED_CACHES,
+                    MEDIA_ROOT=media_root,
+                    SERVER_TIMING_SAMPLE_RATE=0,
+                )
+            ):
+                for scale in options["scales"]:
+                    for budget, result in self.run_scale(scale, budgets):
+                        counts.setdefault(budget, []).append(result)
+        finally:
+            teardown_test_environment()
+
+        for budget in budgets:
+            results = counts[budget]
+            errors = budget_errors(budget, results)
+            line = (
+                f"{budget.method.upper():<6} {budget.path:<56} "
+                f"queries={'/'.join(str(result[0]) for result in results)} "
+                f"(<= {budget.queries}) "
+                f"objects={max(result[1] for result in results)}"
+            )
+            if errors:
+                problems.append(f"{line}: {'; '.join(errors)}")
+                self.stdout.write(self.style.ERROR(f"FAIL {line}"))
+            else:
+                self.stdout.write(f"ok   {line}")
+
+        if problems:
+            raise CommandError(
+                "Бюджеты запросов нарушены:\n" + "\n".join(problems)
+            )
+        self.stdout.write(self.style.SUCCESS("All query budgets hold"))
+
+    def run_scale(self, scale, budgets):
+        test_settings = connection.settings_dict["TEST"]
+        test_name = test_settings["NAME"]
+        if connection.vendor == "sqlite":
+            test_settings["NAME"] = os.path.join(
+                settings.MEDIA_ROOT, "query_budgets.sqlite3"
+            )
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            user, context = build_fixture(scale)
+            token = Token.objects.create(user=user).key
+            return [
+                (budget, run_budget(budget, context, token))
+                for budget in budgets
+            ]
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            test_settings["NAME"] = test_name
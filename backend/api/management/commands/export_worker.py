@@ -0,0 +1,94 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from api.v1.utils import (
+    claim_shopping_cart_export,
+    remove_expired_shopping_cart_exports,
+    run_shopping_cart_export,
+)
+from backend.constants import (
+    EXPORT_CLEANUP_INTERVAL,
+    EXPORT_RETENTION,
+    EXPORT_STALE_AFTER,
+)
+
+
+class Command(BaseCommand):
+    help = "Process queued shopping cart PDF exports"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=2,
+            help="Number of worker threads.",
+        )
+        parser.add_argument(
+            "--poll-interval", type=float, default=1.0,
+            help="Seconds to wait when the queue is empty.",
+        )
+        parser.add_argument(
+            "--stale-after", type=int, default=EXPORT_STALE_AFTER,
+            help="Reclaim running exports older than this many seconds.",
+        )
+        parser.add_argument(
+            "--retention", type=int, default=EXPORT_RETENTION,
+            help="Delete finished exports older than this many seconds.",
+        )
+        parser.add_argument(
+            "--cleanup-interval", type=float,
+            default=EXPORT_CLEANUP_INTERVAL,
+            help="Seconds between removals of expired exports.",
+        )
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Exit when the queue is empty.",
+        )
+
+    def handle(self, **options):
+        threads = [
+            threading.Thread(
+                target=self.work,
+                args=(
+                    options["poll_interval"],
+                    options["stale_after"],
+                    options["once"],
+                ),
+                daemon=True,
+            )
+            for _ in range(max(options["workers"], 1))
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            while threads:
+                self.cleanup(options["retention"])
+                threads[0].join(options["cleanup_interval"])
+                threads = [thread for thread in threads if thread.is_alive()]
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping")
+        connections.close_all()
+
+    def cleanup(self, retention):
+        close_old_connections()
+        removed = remove_expired_shopping_cart_exports(retention)
+        if removed:
+            self.stdout.write(f"Removed {removed} expired exports")
+
+    def work(self, poll_interval, stale_after, once):
+        while True:
+            close_old_connections()
+            job = claim_shopping_cart_export(stale_after)
+            if job is None:
+                if once:
+                    break
+                time.sleep(poll_interval)
+                continue
+            started = time.monotonic()
+            job = run_shopping_cart_export(job)
+            self.stdout.write(
+                f"Export {job.pk} {job.status} "
+                f"in {time.monotonic() - started:.2f}s"
+            )
+        connections.close_all()
@@ -0,0 +1,96 @@
+import hashlib
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.slow_queries import read_slow_queries
+
+SORT_KEYS = {
+    "total": lambda group: group["total"],
+    "max": lambda group: group["max"],
+    "p95": lambda group: group["p95"],
+    "count": lambda group: group["count"],
+}
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[max(math.ceil(fraction * len(values)) - 1, 0)]
+
+
+class Command(BaseCommand):
+    help = "Summarize the slow query log by query fingerprint"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path", default=settings.SLOW_QUERY_LOG,
+            help="Slow query log file.",
+        )
+        parser.add_argument(
+            "--limit", type=int, default=10,
+            help="Number of fingerprints to show.",
+        )
+        parser.add_argument(
+            "--sort", choices=sorted(SORT_KEYS), default="total",
+            help="Order fingerprints by this statistic.",
+        )
+        parser.add_argument(
+            "--plans", action="store_true",
+            help="Print the slowest captured plan for each fingerprint.",
+        )
+
+    def handle(self, **options):
+        groups = defaultdict(lambda: {
+            "durations": [], "views": defaultdict(int), "plan": None,
+            "plan_duration": 0,
+        })
+        try:
+            for entry in read_slow_queries(options["path"]):
+                group = groups[entry["fingerprint"]]
+                group["durations"].append(entry["duration_ms"])
+                group["views"][entry.get("view") or "-"] += 1
+                if entry.get("plan") and (
+                    entry["duration_ms"] > group["plan_duration"]
+                ):
+                    group["plan"] = entry["plan"]
+                    group["plan_duration"] = entry["duration_ms"]
+        except FileNotFoundError:
+            raise CommandError(f"Файл {options['path']} не найден.")
+        if not groups:
+            self.stdout.write("No slow queries recorded")
+            return
+
+        for group in groups.values():
+            durations = group["durations"]
+            group["count"] = len(durations)
+            group["total"] = sum(durations)
+            group["max"] = max(durations)
+            group["p95"] = _percentile(durations, 0.95)
+        ranked = sorted(
+            groups.items(), key=lambda item: SORT_KEYS[options["sort"]](
+                item[1]
+            ), reverse=True,
+        )[:options["limit"]]
+
+        for fingerprint, group in ranked:
+            digest = hashlib.md5(fingerprint.encode()).hexdigest()[:8]
+            views = ", ".join(
+                f"{view} ({count})" for view, count in sorted(
+                    group["views"].items(), key=lambda item: -item[1]
+                )
+            )
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"[{digest}] count={group['count']} "
+                f"total={group['total']:.1f}ms "
+                f"mean={group['total'] / group['count']:.1f}ms "
+                f"p95={group['p95']:.1f}ms max={group['max']:.1f}ms"
+            ))
+            self.stdout.write(f"  views: {views}")
+            self.stdout.write(f"  {fingerprint}")
+            if options["plans"] and group["plan"]:
+                self.stdout.write("  plan:")
+                for line in group["plan"].splitlines():
+                    self.stdout.write(f"    {line}")
+            self.stdout.write("")
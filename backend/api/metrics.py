@@ -0,0 +1,120 @@
+import os
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from api.instrumentation import get_request_timings
+from backend.constants import (
+    REQUEST_LATENCY_BUCKETS,
+    REQUEST_QUERIES_BUCKETS,
+)
+
+REQUEST_LATENCY = Histogram(
+    "foodgram_request_duration_seconds",
+    "Время обработки запроса.",
+    ["route", "method", "status"],
+    buckets=REQUEST_LATENCY_BUCKETS,
+)
+REQUEST_QUERIES = Histogram(
+    "foodgram_request_db_queries",
+    "Число SQL-запросов за один запрос.",
+    ["route"],
+    buckets=REQUEST_QUERIES_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "foodgram_requests_in_flight",
+    "Запросы, обрабатываемые в данный момент.",
+    multiprocess_mode="livesum",
+)
+CACHE_REQUESTS = Counter(
+    "foodgram_cache_requests_total",
+    "Обращения к кэшу ответов по результату.",
+    ["cache", "result"],
+)
+
+
+def record_cache_lookup(cache_name, hit):
+    """Учёт попадания или промаха кэша cache_name."""
+    CACHE_REQUESTS.labels(cache_name, "hit" if hit else "miss").inc()
+
+
+def _route(request):
+    match = request.resolver_match
+    if match is None or not match.view_name:
+        return "unmatched"
+    return match.view_name
+
+
+class MetricsMiddleware:
+    """
+    Метрики запросов в формате Prometheus.
+
+    Задержка и число SQL-запросов собираются по имени маршрута DRF,
+    поэтому у маршрута с параметрами одна серия на все объекты.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+        return self.observe(request, response, start)
+
+    async def __acall__(self, request):
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+        return self.observe(request, response, start)
+
+    def observe(self, request, response, start):
+        route = _route(request)
+        REQUEST_LATENCY.labels(
+            route, request.method, response.status_code
+        ).observe(time.perf_counter() - start)
+        timings = get_request_timings()
+        if timings is not None:
+            REQUEST_QUERIES.labels(route).observe(timings.queries)
+        return response
+
+
+def metrics_view(request):
+    """
+    Метрики всех процессов в текстовом формате Prometheus.
+
+    При запуске под gunicorn каждый воркер пишет свои значения в файлы
+    каталога PROMETHEUS_MULTIPROC_DIR, и ответ собирается из них.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(
+        generate_latest(registry), content_type=CONTENT_TYPE_LATEST
+    )
@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from foodgram.images import image_variants_ready
+from users.models import User
+from .authentication import forget_token
+from .instrumentation import record_query
+from .slow_queries import record_slow_query
+
+
+@receiver(connection_created)
+def instrument_connection(connection, **kwargs):
+    """
+    Обёртки учёта запросов для нового соединения с базой.
+
+    Они ставятся на само соединение, а не на время запроса, потому
+    что async ORM выполняет запросы в других потоках с их собственными
+    соединениями, а данные запроса приходят туда через contextvars.
+    """
+    wrappers = [record_query]
+    if settings.SLOW_QUERY_THRESHOLD_MS > 0:
+        wrappers.append(record_slow_query)
+    # В начало списка: execute_wrapper() снимает последнюю обёртку.
+    connection.execute_wrappers[:0] = [
+        wrapper for wrapper in wrappers
+        if wrapper not in connection.execute_wrappers
+    ]
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(instance, **kwargs):
+    """Удаление токена из кэшей после выхода пользователя."""
+    key, user_id = instance.key, instance.user_id
+    transaction.on_commit(lambda: forget_token(key, user_id))
+
+
+@receiver((post_save, post_delete), sender=User)
+def forget_user_tokens(instance, **kwargs):
+    """Удаление устаревших данных пользователя из кэшей токенов."""
+    user_id = instance.pk
+    transaction.on_commit(lambda: forget_token(user_id=user_id))
+
+
+@receiver(image_variants_ready, sender=User)
+def forget_user_with_new_avatar(pk, **kwargs):
+    """Сброс кэшей токенов после создания миниатюр аватара."""
+    forget_token(user_id=pk)
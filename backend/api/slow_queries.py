@@ -0,0 +1,154 @@
+import json
+import random
+import re
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils import timezone
+
+_request = ContextVar("slow_query_request", default=None)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDERS = re.compile(r"\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\)")
+_SPACES = re.compile(r"\s+")
+_LOCKING = re.compile(
+    r"\bFOR\s+(?:NO\s+KEY\s+)?(?:UPDATE|SHARE)\b", re.IGNORECASE
+)
+
+
+def normalize_sql(sql):
+    """
+    Отпечаток запроса без значений.
+
+    Строки и числа заменяются на ?, а списки IN любой длины сводятся
+    к одному виду, чтобы одинаковые запросы попадали в одну группу.
+    """
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = _PLACEHOLDERS.sub("(...)", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+def explain(connection, sql, params):
+    """
+    План выполнения запроса.
+
+    В PostgreSQL SELECT выполняется повторно с ANALYZE и BUFFERS,
+    прочие запросы и SELECT ... FOR UPDATE, повтор которых снова взял
+    бы блокировки, только планируются. В SQLite используется
+    EXPLAIN QUERY PLAN. Курсор создаётся в обход обёрток Django,
+    чтобы план не попадал в счётчики запросов, поэтому ошибки
+    приходят от драйвера базы, а не как DatabaseError.
+    """
+    if connection.vendor == "postgresql":
+        if sql.lstrip().upper().startswith("SELECT") and not (
+            _LOCKING.search(sql)
+        ):
+            prefix = "EXPLAIN (ANALYZE, BUFFERS) "
+        else:
+            prefix = "EXPLAIN "
+    elif connection.vendor == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    else:
+        return None
+    # Ошибка плана не должна прерывать транзакцию самого запроса.
+    savepoint = connection.vendor == "postgresql" and (
+        connection.in_atomic_block
+    )
+    cursor = connection.create_cursor()
+    try:
+        if savepoint:
+            cursor.execute("SAVEPOINT slow_query_explain")
+        cursor.execute(prefix + sql, params)
+        rows = cursor.fetchall()
+        if savepoint:
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+    except connection.Database.Error:
+        if savepoint:
+            cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+        return None
+    finally:
+        cursor.close()
+    return "\n".join(" ".join(str(value) for value in row) for row in rows)
+
+
+def record_slow_query(execute, sql, params, many, context):
+    """Обёртка соединения, записывающая медленные запросы в журнал."""
+    request = _request.get()
+    if request is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    result = execute(sql, params, many, context)
+    duration = time.perf_counter() - start
+    if duration * 1000 < settings.SLOW_QUERY_THRESHOLD_MS:
+        return result
+    match = request.resolver_match
+    plan = None
+    if not many and random.random() < settings.SLOW_QUERY_EXPLAIN_RATE:
+        plan = explain(context["connection"], sql, params)
+    entry = {
+        "time": timezone.now().isoformat(),
+        "database": context["connection"].alias,
+        "duration_ms": round(duration * 1000, 2),
+        "view": match.view_name if match else None,
+        "method": request.method,
+        "path": request.path,
+        "fingerprint": normalize_sql(sql),
+        "sql": sql,
+        "plan": plan,
+    }
+    with open(settings.SLOW_QUERY_LOG, "a", encoding="utf-8") as log:
+        log.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    return result
+
+
+class SlowQueryMiddleware:
+    """
+    Запись медленных SQL-запросов в файл SLOW_QUERY_LOG.
+
+    Включается настройкой SLOW_QUERY_THRESHOLD_MS: запросы дольше
+    порога записываются вместе с представлением, из которого они
+    пришли, а для доли SLOW_QUERY_EXPLAIN_RATE из них — и с планом.
+    Значения параметров в лог не попадают.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if settings.SLOW_QUERY_THRESHOLD_MS <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            _request.reset(token)
+
+    async def __acall__(self, request):
+        token = _request.set(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            _request.reset(token)
+
+
+def read_slow_queries(path):
+    """Записи журнала медленных запросов, пропуская повреждённые строки."""
+    with open(path, encoding="utf-8") as log:
+        for line in log:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
@@ -0,0 +1,147 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api import authentication
+from api.authentication import (
+    CACHED_USER_FIELDS,
+    TOKEN_USER_KEY,
+    LocalTokenCache,
+    forget_token,
+)
+from backend.constants import (
+    AUTH_TOKEN_LOCAL_CACHE_SIZE,
+    AUTH_TOKEN_LOCAL_CACHE_TIMEOUT,
+)
+from users.models import Subscriptions, User
+
+LOCAL_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "test-authentication",
+    }
+}
+
+
+def create_user(number):
+    return User.objects.create_user(
+        username=f"user{number}",
+        email=f"user{number}@example.com",
+        first_name="Имя",
+        last_name="Фамилия",
+        password="Test-password-1",
+    )
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class CachedUserSaveTests(TestCase):
+    """Сохранение пользователя из кэша токенов не портит счётчики."""
+
+    def test_set_password_keeps_followers_count(self):
+        user, follower = create_user(0), create_user(1)
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user)}"
+        )
+        self.assertEqual(client.get("/api/users/me/").status_code, 200)
+        Subscriptions.objects.create(user=follower, following=user)
+        user.refresh_from_db()
+        self.assertEqual(user.followers_count, 1)
+
+        response = client.post("/api/users/set_password/", {
+            "current_password": "Test-password-1",
+            "new_password": "Test-password-2",
+        })
+        self.assertEqual(response.status_code, 204)
+        user.refresh_from_db()
+        self.assertEqual(user.followers_count, 1)
+        self.assertTrue(user.check_password("Test-password-2"))
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class TokenRevocationTests(TestCase):
+    """
+    Отзыв токена в одном процессе при общем кэше.
+
+    Два процесса моделируются двумя LRU токенов над одним кэшем.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user(0)
+        self.token = Token.objects.create(user=self.user).key
+        self.now = 1000.0
+        self.processes = [
+            LocalTokenCache(
+                AUTH_TOKEN_LOCAL_CACHE_SIZE, AUTH_TOKEN_LOCAL_CACHE_TIMEOUT
+            )
+            for _ in range(2)
+        ]
+
+    def request(self, process, method, url):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        with mock.patch.object(
+            authentication, "token_cache", self.processes[process]
+        ), mock.patch.object(
+            authentication.time, "monotonic", return_value=self.now
+        ), self.captureOnCommitCallbacks(execute=True):
+            return getattr(client, method)(url)
+
+    def test_revoked_token_expires_after_local_timeout(self):
+        for process in range(2):
+            response = self.request(process, "get", "/api/users/me/")
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.request(0, "post", "/api/auth/token/logout/").status_code,
+            204,
+        )
+        self.assertEqual(
+            self.request(0, "get", "/api/users/me/").status_code, 401
+        )
+        # Второй процесс принимает токен, пока жива запись его LRU.
+        self.now += AUTH_TOKEN_LOCAL_CACHE_TIMEOUT - 1
+        self.assertEqual(
+            self.request(1, "get", "/api/users/me/").status_code, 200
+        )
+        self.now += 2
+        self.assertEqual(
+            self.request(1, "get", "/api/users/me/").status_code, 401
+        )
+
+    def test_logout_during_lookup_is_not_cached(self):
+        lookup = TokenAuthentication.authenticate_credentials
+
+        def lookup_then_logout(backend, key):
+            result = lookup(backend, key)
+            # Выход завершается между чтением базы и записью в кэш.
+            Token.objects.filter(key=key).delete()
+            forget_token(key, self.user.pk)
+            return result
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        # Обработчики on_commit не выполняются: отзыв уже сделан вручную.
+        with mock.patch.object(
+            TokenAuthentication, "authenticate_credentials",
+            lookup_then_logout,
+        ), mock.patch.object(
+            authentication, "token_cache", self.processes[0]
+        ):
+            response = client.get("/api/users/me/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.request(1, "get", "/api/users/me/").status_code, 401
+        )
+
+    def test_shared_cache_has_no_password(self):
+        self.request(0, "get", "/api/users/me/")
+        values = cache.get(TOKEN_USER_KEY.format(self.token))
+        self.assertEqual(set(values), set(CACHED_USER_FIELDS))
+        response = self.request(1, "get", "/api/users/me/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["email"], self.user.email)
@@ -0,0 +1,44 @@
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.request import Request
+
+from api.v1.filters import IngredientsFilters
+from api.v1.mixins import catalog_cache_key
+from foodgram.models import Tag
+
+LOCAL_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "test-catalog",
+    }
+}
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class CatalogCacheTests(TestCase):
+    """Условные запросы и ключи кэша справочников."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_change_invalidates_etag(self):
+        response = self.client.get("/api/tags/")
+        self.assertNotIn("Last-Modified", response)
+        etag = response["ETag"]
+        response = self.client.get("/api/tags/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            Tag.objects.create(name="Новый", slug="new")
+        response = self.client.get("/api/tags/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+
+    def test_key_ignores_unknown_params(self):
+        def key(query):
+            request = Request(RequestFactory().get("/api/ingredients/", query))
+            return catalog_cache_key(
+                "ingredients", 1, request, "json", IngredientsFilters
+            )
+
+        self.assertEqual(key({}), key({"utm": "1", "page": "2"}))
+        self.assertIsNone(key({"name": "соль"}))
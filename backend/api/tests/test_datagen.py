@@ -0,0 +1,52 @@
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from foodgram.cache import get_catalog_version
+from foodgram.datagen import generate_dataset
+from foodgram.models import Favorite, ShoppingCart
+from users.models import Subscriptions
+
+LOCAL_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "test-datagen",
+    }
+}
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(CACHES=LOCAL_CACHES, MEDIA_ROOT=MEDIA_ROOT)
+class GenerateDatasetTests(TestCase):
+    """Синтетические данные меняют версии справочников и верно считаются."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def generate(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return generate_dataset(
+                5, recipes_per_user=2, ingredients_per_recipe=2, tags=2,
+                ingredients=4, follows_per_user=3, favorites_per_user=3,
+                carts_per_user=3,
+            )
+
+    def test_catalog_versions_change(self):
+        names = ("tags", "ingredients")
+        versions = [get_catalog_version(name) for name in names]
+        self.generate()
+        for name, version in zip(names, versions):
+            with self.subTest(name=name):
+                self.assertNotEqual(get_catalog_version(name), version)
+
+    def test_counts_match_rows(self):
+        created = self.generate()
+        for model in (Subscriptions, Favorite, ShoppingCart):
+            with self.subTest(model=model.__name__):
+                self.assertEqual(
+                    created[model._meta.model_name], model.objects.count()
+                )
@@ -0,0 +1,126 @@
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.v1.utils import (
+    claim_shopping_cart_export,
+    remove_expired_shopping_cart_exports,
+)
+from backend.constants import EXPORT_RETENTION, EXPORT_STALE_AFTER
+from foodgram.models import ShoppingCartExport
+from users.models import User
+
+LOCAL_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "test-exports",
+    }
+}
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def tearDownModule():
+    shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+
+def create_user():
+    return User.objects.create_user(
+        username="user",
+        email="user@example.com",
+        first_name="Имя",
+        last_name="Фамилия",
+        password="Test-password-1",
+    )
+
+
+def ago(seconds):
+    return timezone.now() - timedelta(seconds=seconds)
+
+
+@override_settings(CACHES=LOCAL_CACHES, MEDIA_ROOT=MEDIA_ROOT)
+class ExportQueueTests(TestCase):
+    """Постановка выгрузок в очередь, захват и удаление старых."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user()
+
+    def create(self, status, **fields):
+        job = ShoppingCartExport.objects.create(
+            user=self.user, status=status
+        )
+        ShoppingCartExport.objects.filter(pk=job.pk).update(**fields)
+        return job
+
+    def test_create_queues_export(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post("/api/shopping_cart_exports/")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["status"], ShoppingCartExport.PENDING)
+        response = client.get(
+            f"/api/shopping_cart_exports/{response.data['id']}/download/"
+        )
+        self.assertEqual(response.status_code, 409)
+
+    def test_claim_oldest_pending_once(self):
+        newer = self.create(ShoppingCartExport.PENDING)
+        older = self.create(ShoppingCartExport.PENDING, created_at=ago(60))
+        self.assertEqual(claim_shopping_cart_export().pk, older.pk)
+        self.assertEqual(claim_shopping_cart_export().pk, newer.pk)
+        self.assertIsNone(claim_shopping_cart_export())
+        older.refresh_from_db()
+        self.assertEqual(older.status, ShoppingCartExport.RUNNING)
+        self.assertIsNotNone(older.started_at)
+
+    def test_claim_reclaims_stale_running(self):
+        self.create(ShoppingCartExport.RUNNING, started_at=ago(1))
+        stale = self.create(
+            ShoppingCartExport.RUNNING,
+            started_at=ago(EXPORT_STALE_AFTER + 1),
+        )
+        self.assertEqual(claim_shopping_cart_export().pk, stale.pk)
+        self.assertIsNone(claim_shopping_cart_export())
+
+    def test_remove_expired(self):
+        expired = ShoppingCartExport(
+            user=self.user, status=ShoppingCartExport.DONE,
+            finished_at=ago(EXPORT_RETENTION + 1),
+        )
+        expired.file.save("expired.pdf", ContentFile(b"%PDF-1.4"))
+        recent = self.create(ShoppingCartExport.DONE, finished_at=ago(1))
+        pending = self.create(
+            ShoppingCartExport.PENDING, created_at=ago(EXPORT_RETENTION + 1)
+        )
+        self.assertEqual(remove_expired_shopping_cart_exports(), 1)
+        self.assertFalse(expired.file.storage.exists(expired.file.name))
+        self.assertEqual(
+            set(ShoppingCartExport.objects.values_list("pk", flat=True)),
+            {recent.pk, pending.pk},
+        )
+
+
+@override_settings(CACHES=LOCAL_CACHES, MEDIA_ROOT=MEDIA_ROOT)
+class ExportWorkerTests(TransactionTestCase):
+    """Команда export_worker разбирает очередь в своих потоках."""
+
+    def test_worker_builds_pdf(self):
+        cache.clear()
+        job = ShoppingCartExport.objects.create(user=create_user())
+        call_command(
+            "export_worker", workers=1, once=True, stdout=io.StringIO()
+        )
+        job.refresh_from_db()
+        self.assertEqual(job.status, ShoppingCartExport.DONE)
+        self.assertIsNotNone(job.finished_at)
+        with job.file.open("rb") as file:
+            self.assertTrue(file.read().startswith(b"%PDF"))
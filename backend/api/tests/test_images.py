@@ -0,0 +1,57 @@
+import io
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+
+from backend.constants import IMAGE_MAX_SIDE, IMAGE_VARIANT_SIZES
+from foodgram.images import cap_image, create_image_variants
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def image_file(size, image_format="PNG", name="image.png"):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 120, 60)).save(buffer, image_format)
+    return ContentFile(buffer.getvalue(), name=name)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ImageVariantsTests(SimpleTestCase):
+    """Миниатюры и ограничение размеров загруженных изображений."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def test_create_image_variants(self):
+        name = default_storage.save(
+            "recipes/images/dish.png", image_file((1000, 500))
+        )
+        variants = create_image_variants(name)
+        self.assertEqual(variants["source"], name)
+        for size_name, size in IMAGE_VARIANT_SIZES.items():
+            for key, image_format in (
+                (size_name, "PNG"), (f"{size_name}_webp", "WEBP")
+            ):
+                with self.subTest(key=key):
+                    with default_storage.open(variants[key]) as file, (
+                        Image.open(file)
+                    ) as image:
+                        self.assertEqual(image.format, image_format)
+                        self.assertEqual(image.size, (size, size // 2))
+        self.assertEqual(create_image_variants(name), variants)
+
+    def test_cap_image(self):
+        small = image_file((100, 100))
+        self.assertIs(cap_image(small), small)
+        capped = cap_image(
+            image_file((IMAGE_MAX_SIDE * 2, 100), "JPEG", "wide.jpeg")
+        )
+        self.assertEqual(capped.name, "wide.jpg")
+        with Image.open(capped) as image:
+            self.assertEqual(image.size, (IMAGE_MAX_SIDE, 50))
@@ -0,0 +1,50 @@
+import base64
+import json
+
+from django.test import TestCase
+
+from users.models import User
+
+
+def encode_cursor(position):
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+class KeysetCursorTests(TestCase):
+    """Некорректный курсор даёт 404, а не ошибку сервера."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for number in range(3):
+            User.objects.create_user(
+                username=f"user{number}",
+                email=f"user{number}@example.com",
+                first_name="Имя",
+                last_name="Фамилия",
+                password="Test-password-1",
+            )
+
+    def test_next_cursor(self):
+        response = self.client.get("/api/users/?cursor=&limit=2")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 2)
+        response = self.client.get(response.data["next"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_invalid_cursors(self):
+        for cursor in (
+            "!!!",
+            base64.urlsafe_b64encode(b"not json").decode(),
+            encode_cursor(5),
+            encode_cursor(["notadate", 1]),
+            encode_cursor([1, 1]),
+            encode_cursor(["2024-01-01T00:00:00+00:00", "x"]),
+            encode_cursor(["2024-01-01T00:00:00+00:00", None]),
+            encode_cursor(["2024-01-01T00:00:00+00:00", 2 ** 70]),
+            encode_cursor(["2024-13-01T00:00:00+00:00", 1]),
+        ):
+            for url in ("/api/users/", "/api/recipes/"):
+                with self.subTest(url=url, cursor=cursor):
+                    response = self.client.get(url, {"cursor": cursor})
+                    self.assertEqual(response.status_code, 404)
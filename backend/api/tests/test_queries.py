@@ -0,0 +1,157 @@
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from foodgram.models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+    Tag,
+)
+from users.models import Subscriptions, User
+
+LOCAL_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "test-queries",
+    }
+}
+
+
+def create_user(number):
+    return User.objects.create_user(
+        username=f"user{number}",
+        email=f"user{number}@example.com",
+        first_name="Имя",
+        last_name="Фамилия",
+        password="Test-password-1",
+    )
+
+
+def create_recipe(author, tags, ingredients, number):
+    recipe = Recipe(
+        author=author,
+        name=f"Рецепт {number}",
+        text="Описание",
+        cooking_time=10,
+    )
+    recipe.image.save(f"{number}.png", ContentFile(b"png"), save=False)
+    recipe.save()
+    recipe.tags.set(tags)
+    RecipeIngredient.objects.bulk_create(
+        RecipeIngredient(recipe=recipe, ingredients=ingredient, amount=2)
+        for ingredient in ingredients
+    )
+    return recipe
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(CACHES=LOCAL_CACHES, MEDIA_ROOT=MEDIA_ROOT)
+class QueryCountTests(TestCase):
+    """Число запросов к базе не зависит от размера страницы."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        tags = [
+            Tag.objects.create(name=f"Тег {number}", slug=f"tag-{number}")
+            for number in range(3)
+        ]
+        ingredients = [
+            Ingredient.objects.create(
+                name=f"Ингредиент {number}", measurement_unit="г"
+            )
+            for number in range(4)
+        ]
+        cls.user = create_user(0)
+        cls.small_cart_user = create_user(1)
+        cls.authors = [create_user(number) for number in range(2, 10)]
+        cls.recipes = [
+            create_recipe(author, tags[:2], ingredients, number)
+            for number, author in enumerate(cls.authors * 2)
+        ]
+        Subscriptions.objects.bulk_create(
+            Subscriptions(user=cls.user, following=author)
+            for author in cls.authors
+        )
+        for model in (Favorite, ShoppingCart):
+            model.objects.bulk_create(
+                model(user=cls.user, recipe=recipe)
+                for recipe in cls.recipes
+            )
+        ShoppingCart.objects.bulk_create(
+            ShoppingCart(user=cls.small_cart_user, recipe=recipe)
+            for recipe in cls.recipes[:2]
+        )
+
+    def get(self, user, url):
+        client = APIClient()
+        client.force_authenticate(user)
+        cache.clear()
+        return client.get(url)
+
+    def assertSameQueries(self, small, large, small_user=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.get(small_user or self.user, small)
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(len(context)):
+            response = self.get(self.user, large)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_recipe_list(self):
+        response = self.assertSameQueries(
+            "/api/recipes/?limit=2", "/api/recipes/?limit=12"
+        )
+        self.assertEqual(len(response.data["results"]), 12)
+
+    def test_subscriptions(self):
+        response = self.assertSameQueries(
+            "/api/users/subscriptions/?limit=2&recipes_limit=1",
+            "/api/users/subscriptions/?limit=8&recipes_limit=2",
+        )
+        self.assertEqual(len(response.data["results"]), 8)
+
+    def test_shopping_cart(self):
+        self.assertSameQueries(
+            "/api/recipes/download_shopping_cart/",
+            "/api/recipes/download_shopping_cart/",
+            small_user=self.small_cart_user,
+        )
+
+    def test_bulk_remove(self):
+        client = APIClient()
+        client.force_authenticate(self.small_cart_user)
+        url = "/api/recipes/bulk_shopping_cart/"
+        with CaptureQueriesContext(connection) as context:
+            response = client.delete(
+                url, {"recipes": [recipe.pk for recipe in self.recipes[:2]]},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 200)
+        client.force_authenticate(self.user)
+        with self.assertNumQueries(len(context)):
+            response = client.delete(
+                url, {"recipes": [recipe.pk for recipe in self.recipes]},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(ShoppingCart.objects.exists())
+        self.assertEqual(
+            set(Recipe.objects.values_list("shopping_carts_count", flat=True)),
+            {0},
+        )
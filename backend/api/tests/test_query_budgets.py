@@ -0,0 +1,51 @@
+import shutil
+import tempfile
+
+from django.db import transaction
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from api.management.commands.check_query_budgets import (
+    CHECKED_CACHES,
+    budget_errors,
+    build_fixture,
+    coverage_problems,
+    run_budget,
+)
+from api.v1.query_budgets import QUERY_BUDGETS
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(
+    CACHES=CHECKED_CACHES,
+    MEDIA_ROOT=MEDIA_ROOT,
+    SERVER_TIMING_SAMPLE_RATE=0,
+)
+class QueryBudgetTests(TestCase):
+    """Бюджеты QUERY_BUDGETS на данных двух размеров."""
+
+    SCALES = (1, 2)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def test_every_route_has_budget(self):
+        self.assertEqual(coverage_problems(), [])
+
+    def test_budgets(self):
+        results = {}
+        for scale in self.SCALES:
+            with transaction.atomic():
+                user, context = build_fixture(scale)
+                token = Token.objects.create(user=user).key
+                for budget in QUERY_BUDGETS:
+                    results.setdefault(budget, []).append(
+                        run_budget(budget, context, token)
+                    )
+                transaction.set_rollback(True)
+        for budget, budget_results in results.items():
+            with self.subTest(method=budget.method, path=budget.path):
+                self.assertEqual(budget_errors(budget, budget_results), [])
@@ -0,0 +1,55 @@
+from django.test import TestCase
+
+from foodgram.models import Recipe
+from foodgram.search import search_recipes
+from users.models import User
+
+
+class SearchRecipesTests(TestCase):
+    """Полнотекстовый поиск находит рецепты по названию и описанию."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            username="author",
+            email="author@example.com",
+            first_name="Имя",
+            last_name="Фамилия",
+            password="Test-password-1",
+        )
+        cls.recipes = {
+            name: Recipe.objects.create(
+                author=author, name=name, text=text,
+                image="recipes/images/recipe.png", cooking_time=5,
+            )
+            for name, text in (
+                ("Борщ", "Свекла и капуста"),
+                ("Салат", "Капуста и морковь"),
+                ("Омлет", "Яйца и молоко"),
+            )
+        }
+
+    def search(self, query):
+        return [
+            recipe.name
+            for recipe in search_recipes(Recipe.objects.all(), query)
+        ]
+
+    def test_name_match_ranks_first(self):
+        self.recipes["Салат"].name = "Салат из капусты"
+        self.recipes["Салат"].save()
+        self.assertEqual(
+            self.search("капуст"), ["Салат из капусты", "Борщ"]
+        )
+
+    def test_no_matches(self):
+        self.assertEqual(self.search("рыба"), [])
+        self.assertEqual(self.search("!!!"), [])
+
+    def test_api_search(self):
+        response = self.client.get("/api/recipes/", {"search": "омлет"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [recipe["name"] for recipe in response.data["results"]],
+            ["Омлет"],
+        )
@@ -0,0 +1,40 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from foodgram.models import Recipe
+from users.models import User
+
+LOCAL_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "test-short-links",
+    }
+}
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class LegacyShortLinkTests(TestCase):
+    """Старые короткие ссылки не переживают удаление рецепта."""
+
+    def test_deleted_recipe_is_forgotten(self):
+        cache.clear()
+        author = User.objects.create_user(
+            username="author",
+            email="author@example.com",
+            first_name="Имя",
+            last_name="Фамилия",
+            password="Test-password-1",
+        )
+        recipe = Recipe.objects.create(
+            author=author, name="Рецепт", text="Описание",
+            image="recipes/images/recipe.png", cooking_time=5,
+        )
+        Recipe.objects.filter(pk=recipe.pk).update(short_url="/legacy1/")
+        for _ in range(2):
+            response = self.client.get("/s/legacy1/")
+            self.assertEqual(response.status_code, 302)
+            self.assertTrue(response["Location"].endswith(f"/{recipe.pk}"))
+        recipe.refresh_from_db()
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.delete()
+        self.assertEqual(self.client.get("/s/legacy1/").status_code, 404)
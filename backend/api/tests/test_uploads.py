@@ -0,0 +1,90 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.test import RequestFactory, TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from api.v1 import parsers
+from api.v1.parsers import SizeLimitedUploadHandler, UploadTooLarge
+from users.models import User
+
+LOCAL_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "test-uploads",
+    }
+}
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def png_bytes():
+    buffer = io.BytesIO()
+    Image.new("RGB", (40, 40), (90, 160, 90)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@override_settings(CACHES=LOCAL_CACHES, MEDIA_ROOT=MEDIA_ROOT)
+class StreamingUploadTests(TestCase):
+    """Изображения пишутся во временный файл и ограничены по размеру."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="user",
+            email="user@example.com",
+            first_name="Имя",
+            last_name="Фамилия",
+            password="Test-password-1",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_raw_body_upload(self):
+        uploaded = []
+        complete = SizeLimitedUploadHandler.file_complete
+
+        def file_complete(handler, size):
+            uploaded.append(complete(handler, size))
+            return uploaded[-1]
+
+        with mock.patch.object(
+            SizeLimitedUploadHandler, "file_complete", file_complete
+        ):
+            response = self.client.put(
+                "/api/users/me/avatar/", png_bytes(),
+                content_type="image/png",
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(uploaded[0], TemporaryUploadedFile)
+        # Временный файл закрыт вместе с запросом, а не сборщиком мусора.
+        self.assertTrue(uploaded[0].closed)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.avatar.name.endswith(".png"))
+
+    def test_too_large_by_content_length(self):
+        with mock.patch.object(parsers, "IMAGE_UPLOAD_MAX_SIZE", 100):
+            response = self.client.put(
+                "/api/users/me/avatar/", png_bytes(),
+                content_type="image/png",
+            )
+        self.assertEqual(response.status_code, 413)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.avatar)
+
+    def test_too_large_while_streaming(self):
+        handler = SizeLimitedUploadHandler(RequestFactory().put("/"))
+        handler.new_file("avatar", "avatar.png", "image/png", None)
+        with mock.patch.object(parsers, "IMAGE_UPLOAD_MAX_SIZE", 100):
+            handler.receive_data_chunk(b"x" * 60, 0)
+            with self.assertRaises(UploadTooLarge):
+                handler.receive_data_chunk(b"x" * 60, 60)
+        self.assertTrue(handler.file.closed)
@@ -0,0 +1,254 @@
+"""
+Асинхронные представления частых запросов чтения.
+
+Подключаются в backend.asgi_urls и обслуживают GET и HEAD под
+ASGI-сервером: запросы к базе идут через async ORM, поэтому медленный
+клиент не занимает рабочий поток. Прочие методы тех же адресов
+передаются синхронным представлениям DRF.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.views import View
+from django_filters.utils import translate_validation
+from rest_framework.exceptions import (
+    APIException,
+    AuthenticationFailed,
+    NotAuthenticated,
+)
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.views import exception_handler
+
+from api.authentication import CachedTokenAuthentication
+from api.metrics import record_cache_lookup
+from backend.constants import CATALOG_CACHE_TIMEOUT
+from foodgram.models import Ingredient, Recipe, Tag
+from foodgram.short_links import decode_short_code, resolve_short_code
+from .filters import IngredientsFilters, RecipeFilters
+from .mixins import (
+    catalog_cache_key,
+    catalog_validators,
+    patch_catalog_headers,
+)
+from .pagination import RecipePagination
+from .serializers import (
+    IngredientSerializer,
+    RecipeSafeMethodSerializer,
+    TagSerializer,
+)
+
+
+async def aget_object_or_404(queryset, **kwargs):
+    """Асинхронный get_object_or_404 с тем же текстом ошибки."""
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise Http404(
+            f"No {queryset.model._meta.object_name} matches the given query."
+        )
+
+
+def filter_queryset(filterset):
+    """Отфильтрованный queryset или ValidationError, как в DRF."""
+    if not filterset.is_valid():
+        raise translate_validation(filterset.errors)
+    return filterset.qs
+
+
+class AsyncReadView(View):
+    """
+    Асинхронное представление чтения с запасным синхронным путём.
+
+    Пользователь определяется той же аутентификацией по токену, что и
+    в DRF, а ошибки превращаются в ответы обработчиком исключений DRF.
+    Методы, кроме GET и HEAD, выполняет sync_view в отдельном потоке.
+    """
+
+    sync_view = None
+    renderer = JSONRenderer()
+    authenticator = CachedTokenAuthentication()
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # csrf_exempt из Django 4.2 превращает представление в синхронное.
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return await sync_to_async(self.sync_view)(
+                request, *args, **kwargs
+            )
+        self.request = request = Request(request)
+        try:
+            result = await sync_to_async(self.authenticator.authenticate)(
+                request
+            )
+            request.user = result[0] if result else AnonymousUser()
+            return await self.get(request, *args, **kwargs)
+        except (APIException, Http404) as exc:
+            return self.handle_exception(exc)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+            exc.auth_header = self.authenticator.authenticate_header(
+                self.request
+            )
+        response = exception_handler(
+            exc, {"view": self, "request": self.request}
+        )
+        rendered = self.render(response.data, response.status_code)
+        if "WWW-Authenticate" in response:
+            rendered["WWW-Authenticate"] = response["WWW-Authenticate"]
+        return rendered
+
+    def render(self, data, status=200):
+        response = HttpResponse(
+            self.renderer.render(data),
+            status=status,
+            content_type=self.renderer.media_type,
+        )
+        patch_vary_headers(response, ["Accept"])
+        return response
+
+
+class RecipeListView(AsyncReadView):
+    """Лента рецептов с фильтрами и пагинацией рецептов DRF."""
+
+    async def get(self, request):
+        filterset = RecipeFilters(
+            request.query_params,
+            queryset=Recipe.objects.with_related(request.user),
+            request=request,
+        )
+        # Проверка автора в фильтре обращается к базе синхронно.
+        queryset = await sync_to_async(filter_queryset)(filterset)
+        paginator = RecipePagination()
+        recipes = await paginator.apaginate_queryset(queryset, request)
+        serializer = RecipeSafeMethodSerializer(
+            recipes, many=True, context={"request": request}
+        )
+        return self.render(
+            paginator.get_paginated_response(serializer.data).data
+        )
+
+
+class RecipeDetailView(AsyncReadView):
+    """Рецепт с флагами текущего пользователя."""
+
+    async def get(self, request, pk):
+        recipe = await aget_object_or_404(
+            Recipe.objects.with_related(request.user), pk=pk
+        )
+        return self.render(
+            RecipeSafeMethodSerializer(
+                recipe, context={"request": request}
+            ).data
+        )
+
+
+class AsyncCatalogView(AsyncReadView):
+    """
+    Справочник с условными запросами и кэшем ответов.
+
+    Ключи кэша и заголовки те же, что у CatalogCacheMixin, поэтому
+    синхронный и асинхронный сервисы пользуются общими записями —
+    для этого backend.asgi требует общий кэш (REQUIRE_SHARED_CACHE).
+    """
+
+    catalog_name = None
+    filterset_class = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Подклассы задают справочник и асинхронный get_data(),
+        # возвращающий сериализованные данные ответа.
+        if cls.catalog_name is None or not hasattr(cls, "get_data"):
+            raise ImproperlyConfigured(
+                f"{cls.__name__} должен задать catalog_name и get_data()."
+            )
+        return super().as_view(**initkwargs)
+
+    async def get(self, request, *args, **kwargs):
+        version, etag = await sync_to_async(catalog_validators)(
+            self.catalog_name
+        )
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            key = catalog_cache_key(
+                self.catalog_name,
+                version,
+                request,
+                self.renderer.format,
+                self.filterset_class,
+            )
+            data = None
+            if key is not None:
+                data = await cache.aget(key)
+                record_cache_lookup("catalog", data is not None)
+            if data is None:
+                data = await self.get_data(request, *args, **kwargs)
+                if key is not None:
+                    await cache.aset(key, data, CATALOG_CACHE_TIMEOUT)
+            response = self.render(data)
+        return patch_catalog_headers(response, etag)
+
+
+class TagListView(AsyncCatalogView):
+    catalog_name = "tags"
+
+    async def get_data(self, request):
+        tags = [tag async for tag in Tag.objects.all()]
+        return TagSerializer(tags, many=True).data
+
+
+class TagDetailView(AsyncCatalogView):
+    catalog_name = "tags"
+
+    async def get_data(self, request, pk):
+        tag = await aget_object_or_404(Tag.objects.all(), pk=pk)
+        return TagSerializer(tag).data
+
+
+class IngredientListView(AsyncCatalogView):
+    catalog_name = "ingredients"
+    filterset_class = IngredientsFilters
+
+    async def get_data(self, request):
+        queryset = filter_queryset(self.filterset_class(
+            request.query_params,
+            queryset=Ingredient.objects.all(),
+            request=request,
+        ))
+        ingredients = [ingredient async for ingredient in queryset]
+        return IngredientSerializer(ingredients, many=True).data
+
+
+class IngredientDetailView(AsyncCatalogView):
+    catalog_name = "ingredients"
+
+    async def get_data(self, request, pk):
+        ingredient = await aget_object_or_404(
+            Ingredient.objects.all(), pk=pk
+        )
+        return IngredientSerializer(ingredient).data
+
+
+class ShortLinkView(View):
+    """Перенаправление коротких ссылок на страницу рецепта."""
+
+    async def get(self, request, short_code):
+        pk = decode_short_code(short_code)
+        if pk is None:
+            # Старые коды ищутся в базе.
+            pk = await sync_to_async(resolve_short_code)(short_code)
+        if pk is None:
+            raise Http404
+        return HttpResponseRedirect(
+            request.build_absolute_uri(f"/recipes/{pk}")
+        )
@@ -1,6 +1,9 @@
+from django.db.models import Exists, OuterRef
 from django_filters.rest_framework import FilterSet, filters
 
-from foodgram.models import Recipe
+from foodgram.cache import get_tag_ids
+from foodgram.models import Favorite, Recipe, ShoppingCart
+from foodgram.search import search_recipes
 
 
 class RecipeFilters(FilterSet):
@@ -8,9 +11,11 @@ class RecipeFilters(FilterSet):
     is_in_shopping_cart = filters.BooleanFilter(
         method="filter_is_in_shopping_cart"
     )
-    tags = filters.AllValuesMultipleFilter(
-        field_name="tags__slug", lookup_expr="exact"
+    tags = filters.MultipleChoiceFilter(
+        choices=lambda: [(slug, slug) for slug in get_tag_ids()],
+        method="filter_tags",
     )
+    search = filters.CharFilter(method="filter_search")
 
     class Meta:
         model = Recipe
@@ -19,13 +24,35 @@ class RecipeFilters(FilterSet):
     def filter_is_favorited(self, qs, name, value):
         user = self.request.user
         if value and user.is_authenticated:
-            return qs.filter(favorites__user=user)
+            return qs.filter(Exists(
+                Favorite.objects.filter(user=user, recipe=OuterRef("pk"))
+            ))
+        return qs
+
+    def filter_tags(self, qs, name, value):
+        # EXISTS вместо соединения с тегами: рецепт с несколькими
+        # выбранными тегами не повторяется, и DISTINCT не нужен.
+        tag_ids = get_tag_ids()
+        return qs.filter(Exists(
+            Recipe.tags.through.objects.filter(
+                recipe=OuterRef("pk"),
+                tag_id__in=[
+                    tag_ids[slug] for slug in value if slug in tag_ids
+                ],
+            )
+        ))
+
+    def filter_search(self, qs, name, value):
+        if value.strip():
+            return search_recipes(qs, value)
         return qs
 
     def filter_is_in_shopping_cart(self, qs, name, value):
         user = self.request.user
         if value and user.is_authenticated:
-            return qs.filter(shopping_carts__user=user)
+            return qs.filter(Exists(
+                ShoppingCart.objects.filter(user=user, recipe=OuterRef("pk"))
+            ))
         return qs
 
 
@@ -0,0 +1,107 @@
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from rest_framework.response import Response
+
+from api.metrics import record_cache_lookup
+from backend.constants import CATALOG_CACHE_TIMEOUT
+from foodgram.cache import get_catalog_version
+
+# Свободный текст поиска давал бы по записи кэша на каждое нажатие
+# клавиши и вытеснял бы остальные записи, поэтому такие ответы
+# не кэшируются.
+UNCACHED_CATALOG_PARAMS = ("name",)
+
+
+def catalog_validators(catalog_name):
+    """
+    Версия справочника и ETag по ней.
+
+    Last-Modified не отдаётся: у него точность в секунду, и изменение
+    в ту же секунду, что и прошлое, давало бы клиентам ложный 304.
+    """
+    version = get_catalog_version(catalog_name)
+    return version, quote_etag(f"{catalog_name}-{version}")
+
+
+def catalog_cache_key(
+    catalog_name, version, request, renderer_format, filterset_class=None
+):
+    """
+    Ключ кэша сериализованного ответа справочника.
+
+    В ключ попадают только параметры фильтров filterset_class:
+    остальные не меняют ответ и лишь плодили бы записи. Параметры
+    сортируются, чтобы их порядок не давал разных ключей. Для запросов
+    с полнотекстовыми параметрами возвращает None.
+    """
+    params = request.query_params
+    if any(params.get(name) for name in UNCACHED_CATALOG_PARAMS):
+        return None
+    names = filterset_class.base_filters if filterset_class else ()
+    return ":".join((
+        "catalog",
+        catalog_name,
+        str(version),
+        renderer_format,
+        request.path,
+        urlencode(sorted(
+            (name, value)
+            for name in names
+            for value in params.getlist(name)
+        )),
+    ))
+
+
+def patch_catalog_headers(response, etag):
+    """Заголовки условных запросов для ответа справочника."""
+    response["ETag"] = etag
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+class CatalogCacheMixin:
+    """
+    Условные GET-запросы и кэширование ответов справочника.
+
+    ETag вычисляется по версии справочника, поэтому
+    клиент с актуальной копией получает 304 без обращения к базе.
+    Сериализованные данные хранятся в кэше под ключом, содержащим
+    версию, и устаревают сами при её смене. Ответы на поиск по
+    названию не кэшируются.
+    """
+
+    catalog_name = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        version, etag = catalog_validators(self.catalog_name)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            key = catalog_cache_key(
+                self.catalog_name,
+                version,
+                request,
+                request.accepted_renderer.format,
+                getattr(self, "filterset_class", None),
+            )
+            data = None
+            if key is not None:
+                data = cache.get(key)
+                record_cache_lookup("catalog", data is not None)
+            if data is None:
+                response = handler(request, *args, **kwargs)
+                if key is not None and response.status_code == 200:
+                    cache.set(key, response.data, CATALOG_CACHE_TIMEOUT)
+            else:
+                response = Response(data)
+        return patch_catalog_headers(response, etag)
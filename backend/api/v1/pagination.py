@@ -0,0 +1,154 @@
+import base64
+import binascii
+import json
+
+from django.core.paginator import InvalidPage, Page
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    LimitOffsetPagination,
+    PageNumberPagination,
+)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from backend.constants import MAX_PAGE_SIZE
+
+
+class KeysetPaginationMixin:
+    """
+    Необязательный постраничный вывод по ключу.
+
+    Если в запросе есть параметр cursor (в том числе пустой), записи
+    сортируются по убыванию keyset_fields, а следующая страница
+    выбирается условием по ключу последней записи вместо OFFSET и
+    COUNT(*), поэтому время запроса не зависит от глубины ленты.
+    Без cursor работает обычная пагинация базового класса.
+    """
+
+    cursor_query_param = "cursor"
+    limit_query_param = "limit"
+    keyset_fields = None
+    invalid_cursor_message = "Некорректный курсор."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset_mode = self.cursor_query_param in request.query_params
+        if not self.keyset_mode:
+            return super().paginate_queryset(queryset, request, view)
+        queryset, page_size = self.get_keyset_queryset(queryset, request)
+        return self.get_keyset_page(
+            list(queryset[:page_size + 1]), page_size
+        )
+
+    def get_keyset_queryset(self, queryset, request):
+        self.request = request
+        field, pk_field = self.keyset_fields
+        queryset = queryset.order_by(f"-{field}", f"-{pk_field}")
+        position = self.decode_cursor(
+            request.query_params[self.cursor_query_param]
+        )
+        if position is not None:
+            value, pk = position
+            queryset = queryset.filter(
+                Q(**{f"{field}__lt": value})
+                | Q(**{field: value, f"{pk_field}__lt": pk})
+            )
+        return queryset, self.get_keyset_page_size(request)
+
+    def get_keyset_page(self, results, page_size):
+        field, pk_field = self.keyset_fields
+        self.next_position = None
+        if len(results) > page_size:
+            results = results[:page_size]
+            last = results[-1]
+            self.next_position = (
+                getattr(last, field).isoformat(), getattr(last, pk_field)
+            )
+        return results
+
+    def get_paginated_response(self, data):
+        if not self.keyset_mode:
+            return super().get_paginated_response(data)
+        return Response({
+            "next": self.get_next_cursor_link(),
+            "previous": None,
+            "results": data,
+        })
+
+    def get_keyset_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE
+        return min(max(page_size, 1), MAX_PAGE_SIZE)
+
+    def get_next_cursor_link(self):
+        if self.next_position is None:
+            return None
+        cursor = base64.urlsafe_b64encode(
+            json.dumps(self.next_position).encode()
+        ).decode()
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, cursor
+        )
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None
+        try:
+            value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            value, pk = parse_datetime(value), int(pk)
+        except (binascii.Error, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        # Ключ попадает в условие запроса, поэтому значения, которые
+        # база не примет, отсекаются здесь.
+        if value is None or not 0 < pk < 2 ** 63:
+            raise NotFound(self.invalid_cursor_message)
+        return value, pk
+
+
+class RecipePagination(KeysetPaginationMixin, PageNumberPagination):
+    page_size_query_param = "limit"
+    keyset_fields = ("created_at", "id")
+
+    async def apaginate_queryset(self, queryset, request):
+        """Вариант paginate_queryset, читающий данные через async ORM."""
+        self.keyset_mode = self.cursor_query_param in request.query_params
+        if not self.keyset_mode:
+            return await self.apaginate_base_queryset(queryset, request)
+        queryset, page_size = self.get_keyset_queryset(queryset, request)
+        return self.get_keyset_page(
+            [item async for item in queryset[:page_size + 1]], page_size
+        )
+
+    async def apaginate_base_queryset(self, queryset, request):
+        # Число записей считается заранее, чтобы Paginator и Page
+        # не обращались к базе синхронно.
+        self.request = request
+        paginator = self.django_paginator_class(
+            queryset, self.get_page_size(request)
+        )
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            number = paginator.validate_number(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            ))
+        bottom = (number - 1) * paginator.per_page
+        self.page = Page(
+            [
+                item async for item in
+                queryset[bottom:bottom + paginator.per_page]
+            ],
+            number,
+            paginator,
+        )
+        return list(self.page)
+
+
+class UserPagination(KeysetPaginationMixin, LimitOffsetPagination):
+    keyset_fields = ("date_joined", "id")
@@ -0,0 +1,97 @@
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.utils.datastructures import MultiValueDict
+from rest_framework import parsers, status
+from rest_framework.exceptions import APIException
+
+from backend.constants import IMAGE_UPLOAD_MAX_SIZE
+
+
+class UploadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = (
+        f"Файл больше {IMAGE_UPLOAD_MAX_SIZE // (1024 * 1024)} МБ."
+    )
+    default_code = "upload_too_large"
+
+
+class SizeLimitedUploadHandler(TemporaryFileUploadHandler):
+    """
+    Запись загружаемого файла во временный файл по частям.
+
+    Размер проверяется после каждой части, поэтому слишком большой
+    файл отклоняется, не дочитываясь до конца.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > IMAGE_UPLOAD_MAX_SIZE:
+            self.file.close()
+            raise UploadTooLarge()
+        return super().receive_data_chunk(raw_data, start)
+
+
+class StreamingUploadMixin:
+    """Потоковая загрузка файлов вместо чтения тела запроса в память."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = parser_context["request"]
+        try:
+            content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            content_length = 0
+        if content_length > IMAGE_UPLOAD_MAX_SIZE:
+            raise UploadTooLarge()
+        request.upload_handlers = [SizeLimitedUploadHandler(request)]
+        return super().parse(stream, media_type, parser_context)
+
+
+class ImageMultiPartParser(StreamingUploadMixin, parsers.MultiPartParser):
+    """Изображение в поле формы multipart/form-data."""
+
+
+class ImageUploadParser(StreamingUploadMixin, parsers.FileUploadParser):
+    """
+    Изображение в теле запроса как есть, например image/png.
+
+    Файл оказывается в поле file, имя берётся из Content-Disposition,
+    а без него строится по типу содержимого.
+    """
+
+    media_type = "image/*"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        result = super().parse(stream, media_type, parser_context)
+        # DRF передаёт файлы запросу Django, который закрывает их в
+        # конце ответа, только для форм. Иначе временный файл закрывает
+        # сборщик мусора, когда хранилище уже переместило его, и в лог
+        # попадает FileNotFoundError.
+        parser_context["request"]._request._files = MultiValueDict(
+            {name: [file] for name, file in result.files.items()}
+        )
+        return result
+
+    def get_filename(self, stream, media_type, parser_context):
+        filename = super().get_filename(stream, media_type, parser_context)
+        if filename:
+            return filename
+        return "upload." + media_type.split("/")[-1].split(";")[0].strip()
+
+
+IMAGE_PARSER_CLASSES = (
+    parsers.JSONParser, ImageMultiPartParser, ImageUploadParser
+)
+
+
+def get_image_data(request, field_name):
+    """
+    Данные запроса с изображением в поле field_name.
+
+    Изображение, пришедшее телом запроса, переносится из поля file.
+    """
+    if field_name not in request.data and "file" in request.FILES:
+        return {field_name: request.FILES["file"]}
+    return request.data
@@ -0,0 +1,180 @@
+"""
+Бюджеты SQL-запросов и сериализованных объектов для маршрутов API.
+
+Каждый маршрут и метод из router_v_1, auth/ и s/<code>/ описан
+запросом к нему и предельными значениями. Команда check_query_budgets
+выполняет эти запросы на данных нескольких размеров и падает, если
+бюджет превышен или число запросов растёт вместе с данными.
+В path и data подставляются значения подготовленных данных:
+user, author, stranger, recipe, other_recipe, fresh_recipe,
+saved_recipes, fresh_recipes, tag, tag_slug, ingredient,
+ingredient_prefix, export, short_code, email, password и image.
+"""
+from collections import namedtuple
+
+from backend.constants import BULK_RECIPES_MAX_LENGTH
+
+RouteBudget = namedtuple(
+    "RouteBudget",
+    ["route", "method", "path", "queries", "objects", "status", "data",
+     "auth"],
+    defaults=(None, True),
+)
+
+
+def _recipe_data(context):
+    return {
+        "name": "Проверочный рецепт",
+        "text": "Описание",
+        "cooking_time": 10,
+        "image": context["image"],
+        "tags": [context["tag"]],
+        "ingredients": [{"id": context["ingredient"], "amount": 5}],
+    }
+
+
+# Ответ массового изменения содержит статус каждого переданного id.
+BULK_OBJECTS = BULK_RECIPES_MAX_LENGTH + 1
+
+
+def _bulk_data(context):
+    return {
+        "recipes": [
+            *context["fresh_recipes"], *context["saved_recipes"], 10 ** 9,
+        ],
+    }
+
+
+def _user_data(context):
+    return {
+        "email": "new-user@example.com",
+        "username": "new-user",
+        "first_name": "Имя",
+        "last_name": "Фамилия",
+        "password": context["password"],
+    }
+
+
+QUERY_BUDGETS = (
+    # Справочники.
+    RouteBudget("ingredients-list", "get",
+                "/api/ingredients/?name={ingredient_prefix}", 2, 50, 200),
+    RouteBudget("ingredients-autocomplete", "get",
+                "/api/ingredients/autocomplete/?name=а", 2, 10, 200),
+    RouteBudget("ingredients-detail", "get",
+                "/api/ingredients/{ingredient}/", 2, 1, 200),
+    RouteBudget("tags-list", "get", "/api/tags/", 2, 10, 200),
+    RouteBudget("tags-detail", "get", "/api/tags/{tag}/", 2, 1, 200),
+    # Рецепты.
+    RouteBudget("recipes-list", "get", "/api/recipes/", 6, 80, 200),
+    RouteBudget("recipes-list", "get",
+                "/api/recipes/?is_favorited=1&tags={tag_slug}", 7, 80, 200),
+    RouteBudget("recipes-list", "post", "/api/recipes/", 15, 20, 201,
+                _recipe_data),
+    RouteBudget("recipes-detail", "get", "/api/recipes/{other_recipe}/",
+                6, 20, 200),
+    RouteBudget("recipes-detail", "patch", "/api/recipes/{recipe}/",
+                19, 20, 200, _recipe_data),
+    RouteBudget("recipes-detail", "delete", "/api/recipes/{recipe}/",
+                12, 0, 204),
+    RouteBudget("recipes-favorite", "post",
+                "/api/recipes/{fresh_recipe}/favorite/", 7, 2, 201),
+    RouteBudget("recipes-favorite", "delete",
+                "/api/recipes/{other_recipe}/favorite/", 5, 0, 204),
+    RouteBudget("recipes-shopping-cart", "post",
+                "/api/recipes/{fresh_recipe}/shopping_cart/", 7, 2, 201),
+    RouteBudget("recipes-shopping-cart", "delete",
+                "/api/recipes/{other_recipe}/shopping_cart/", 5, 0, 204),
+    RouteBudget("recipes-bulk-favorite", "post",
+                "/api/recipes/bulk_favorite/", 6, BULK_OBJECTS, 200,
+                _bulk_data),
+    RouteBudget("recipes-bulk-favorite", "delete",
+                "/api/recipes/bulk_favorite/", 6, BULK_OBJECTS, 200,
+                _bulk_data),
+    RouteBudget("recipes-bulk-shopping-cart", "post",
+                "/api/recipes/bulk_shopping_cart/", 6, BULK_OBJECTS, 200,
+                _bulk_data),
+    RouteBudget("recipes-bulk-shopping-cart", "delete",
+                "/api/recipes/bulk_shopping_cart/", 6, BULK_OBJECTS, 200,
+                _bulk_data),
+    RouteBudget("recipes-get-link", "get",
+                "/api/recipes/{other_recipe}/get-link/", 2, 1, 200),
+    RouteBudget("recipes-image", "patch", "/api/recipes/{recipe}/image/",
+                7, 1, 200, lambda context: {"image": context["image"]}),
+    RouteBudget("recipes-download-shopping-cart", "get",
+                "/api/recipes/download_shopping_cart/", 2, 0, 200),
+    RouteBudget("short-link", "get", "/s/{short_code}/", 0, 0, 302,
+                auth=False),
+    # Выгрузки списка покупок.
+    RouteBudget("shopping-cart-exports-list", "post",
+                "/api/shopping_cart_exports/", 2, 1, 202),
+    RouteBudget("shopping-cart-exports-detail", "get",
+                "/api/shopping_cart_exports/{export}/", 2, 1, 200),
+    RouteBudget("shopping-cart-exports-download", "get",
+                "/api/shopping_cart_exports/{export}/download/", 2, 0, 200),
+    # Пользователи.
+    RouteBudget("users-list", "get", "/api/users/", 4, 20, 200),
+    RouteBudget("users-list", "post", "/api/users/", 2, 1, 201,
+                _user_data, False),
+    RouteBudget("users-detail", "get", "/api/users/{author}/", 3, 2, 200),
+    RouteBudget("users-detail", "put", "/api/users/{author}/", 1, 1, 403,
+                _user_data),
+    RouteBudget("users-detail", "patch", "/api/users/{author}/",
+                1, 1, 403, _user_data),
+    RouteBudget("users-detail", "delete", "/api/users/{author}/",
+                1, 1, 403),
+    RouteBudget("users-me", "get", "/api/users/me/", 2, 2, 200),
+    RouteBudget("users-subscriptions", "get",
+                "/api/users/subscriptions/?recipes_limit=3", 4, 50, 200),
+    RouteBudget("users-subscribe", "post",
+                "/api/users/{stranger}/subscribe/?recipes_limit=3",
+                9, 10, 201),
+    RouteBudget("users-subscribe", "delete",
+                "/api/users/{author}/subscribe/", 5, 0, 204),
+    RouteBudget("users-avatar", "put", "/api/users/me/avatar/", 2, 1, 200,
+                lambda context: {"avatar": context["image"]}),
+    RouteBudget("users-avatar", "delete", "/api/users/me/avatar/",
+                2, 0, 204),
+    RouteBudget("users-set-password", "post", "/api/users/set_password/",
+                2, 0, 204, lambda context: {
+                    "current_password": context["password"],
+                    "new_password": context["password"] + "-new",
+                }),
+    RouteBudget("users-set-username", "post", "/api/users/set_email/",
+                3, 0, 204, lambda context: {
+                    "current_password": context["password"],
+                    "new_email": "changed@example.com",
+                }),
+    RouteBudget("users-reset-password", "post",
+                "/api/users/reset_password/", 1, 0, 204,
+                lambda context: {"email": "nobody@example.com"}, False),
+    RouteBudget("users-reset-password-confirm", "post",
+                "/api/users/reset_password_confirm/", 0, 1, 400,
+                lambda context: {
+                    "uid": "x", "token": "x", "new_password": "x",
+                }, False),
+    RouteBudget("users-reset-username", "post", "/api/users/reset_email/",
+                1, 0, 204, lambda context: {"email": "nobody@example.com"},
+                False),
+    RouteBudget("users-reset-username-confirm", "post",
+                "/api/users/reset_email_confirm/", 0, 1, 400,
+                lambda context: {"uid": "x", "token": "x", "new_email": ""},
+                False),
+    RouteBudget("users-activation", "post", "/api/users/activation/",
+                0, 1, 400, lambda context: {"uid": "x", "token": "x"},
+                False),
+    RouteBudget("users-resend-activation", "post",
+                "/api/users/resend_activation/", 1, 0, 400,
+                lambda context: {"email": context["email"]}, False),
+    # Маршруты djoser в auth/.
+    RouteBudget("login", "post", "/api/auth/token/login/", 3, 1, 200,
+                lambda context: {
+                    "email": context["email"],
+                    "password": context["password"],
+                }, False),
+    RouteBudget("logout", "post", "/api/auth/token/logout/", 3, 0, 204),
+    RouteBudget("user-list", "get", "/api/auth/users/", 4, 20, 200),
+    RouteBudget("user-me", "get", "/api/auth/users/me/", 2, 2, 200),
+    RouteBudget("user-detail", "get", "/api/auth/users/{author}/",
+                3, 2, 200),
+)
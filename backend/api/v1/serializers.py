@@ -1,9 +1,16 @@
 import base64
 
 from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Manager
 from rest_framework import serializers
 from rest_framework.relations import SlugRelatedField
 
+from api.instrumentation import timed
+from backend.constants import BULK_RECIPES_MAX_LENGTH
+from foodgram.cache import bump_recipe_shopping_carts
+from foodgram.images import cap_image
 from foodgram.models import (
     Ingredient,
     Tag,
@@ -11,10 +18,20 @@ from foodgram.models import (
     RecipeIngredient,
     Favorite,
     ShoppingCart,
+    ShoppingCartExport,
 )
 from users.models import User, Subscriptions
 
 
+def get_recipes_limit(request):
+    """Значение параметра recipes_limit или None, если он не задан."""
+    try:
+        limit = int(request.GET["recipes_limit"])
+    except (KeyError, ValueError):
+        return None
+    return limit if limit >= 0 else None
+
+
 class TagSerializer(serializers.ModelSerializer):
     class Meta:
         fields = ("id", "name", "slug")
@@ -36,7 +53,47 @@ class Base64ImageField(serializers.ImageField):
 
             data = ContentFile(base64.b64decode(imgstr), name="temp." + ext)
 
-        return super().to_internal_value(data)
+        image = super().to_internal_value(data)
+        try:
+            return cap_image(image)
+        except ValueError as error:
+            raise serializers.ValidationError(str(error))
+
+
+class ImageVariantsField(serializers.Field):
+    """Ссылки на миниатюры изображения по их названиям."""
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, variants):
+        request = self.context.get("request")
+        urls = {}
+        for name, path in variants.items():
+            if name == "source":
+                continue
+            url = default_storage.url(path)
+            urls[name] = request.build_absolute_uri(url) if request else url
+        return urls
+
+
+class TimedListSerializer(serializers.ListSerializer):
+    """Список, время сериализации которого попадает в Server-Timing."""
+
+    @property
+    def data(self):
+        with timed("serialize"):
+            return super().data
+
+
+class TimedSerializerMixin:
+    """Учёт времени сериализации объекта в Server-Timing."""
+
+    @property
+    def data(self):
+        with timed("serialize"):
+            return super().data
 
 
 class PutAvatarSerializer(serializers.ModelSerializer):
@@ -47,11 +104,47 @@ class PutAvatarSerializer(serializers.ModelSerializer):
         fields = ["avatar"]
 
 
+class RecipeImageSerializer(serializers.ModelSerializer):
+    image = Base64ImageField()
+
+    class Meta:
+        model = Recipe
+        fields = ["image"]
+
+
+class UserListSerializer(serializers.ListSerializer):
+    """
+    Список пользователей с флагом подписки, полученным одним запросом.
+
+    Пользователям без аннотации is_subscribed флаг проставляется по
+    подпискам текущего пользователя на всю страницу сразу.
+    """
+
+    def to_representation(self, data):
+        users = list(data.all() if isinstance(data, Manager) else data)
+        request = self.context.get("request")
+        missing = [
+            user for user in users if not hasattr(user, "is_subscribed")
+        ]
+        if missing and request and request.user.is_authenticated:
+            following = set(
+                Subscriptions.objects.filter(
+                    user=request.user,
+                    following__in=[user.pk for user in missing],
+                ).values_list("following_id", flat=True)
+            )
+            for user in missing:
+                user.is_subscribed = user.pk in following
+        return super().to_representation(users)
+
+
 class UserSerializer(serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField(read_only=True)
+    avatar_variants = ImageVariantsField()
 
     class Meta:
         model = User
+        list_serializer_class = UserListSerializer
         fields = [
             "id",
             "email",
@@ -60,9 +153,12 @@ class UserSerializer(serializers.ModelSerializer):
             "last_name",
             "is_subscribed",
             "avatar",
+            "avatar_variants",
         ]
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, "is_subscribed"):
+            return obj.is_subscribed
         user = self.context.get("request")
         return (
             user
@@ -85,21 +181,22 @@ class IngredientInRecipeSerializer(serializers.ModelSerializer):
 
 
 class CreateRecipeIngredientSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(
-        queryset=Ingredient.objects.all(), source="ingredients"
-    )
+    id = serializers.IntegerField(source="ingredients")
 
     class Meta:
         model = RecipeIngredient
         fields = ("id", "amount")
 
 
-class RecipeSafeMethodSerializer(serializers.ModelSerializer):
+class RecipeSafeMethodSerializer(
+    TimedSerializerMixin, serializers.ModelSerializer
+):
     tags = TagSerializer(many=True, read_only=True)
     ingredients = IngredientInRecipeSerializer(many=True, source="recipes")
     author = UserSerializer()
     is_favorited = serializers.SerializerMethodField(read_only=True)
     is_in_shopping_cart = serializers.SerializerMethodField(read_only=True)
+    image_variants = ImageVariantsField()
 
     class Meta:
         fields = (
@@ -109,14 +206,18 @@ class RecipeSafeMethodSerializer(serializers.ModelSerializer):
             "ingredients",
             "name",
             "image",
+            "image_variants",
             "text",
             "cooking_time",
             "is_favorited",
             "is_in_shopping_cart",
         )
         model = Recipe
+        list_serializer_class = TimedListSerializer
 
     def get_is_favorited(self, obj):
+        if hasattr(obj, "is_favorited"):
+            return obj.is_favorited
         user = self.context.get("request").user
 
         return (
@@ -126,6 +227,8 @@ class RecipeSafeMethodSerializer(serializers.ModelSerializer):
         )
 
     def get_is_in_shopping_cart(self, obj):
+        if hasattr(obj, "is_in_shopping_cart"):
+            return obj.is_in_shopping_cart
         user = self.context.get("request").user
 
         return (
@@ -155,6 +258,19 @@ class RecipeSerializer(serializers.ModelSerializer):
         )
         model = Recipe
 
+    def validate_ingredients(self, value):
+        """Проверка существования всех ингредиентов одним запросом."""
+        ingredients = Ingredient.objects.in_bulk(
+            [ing["ingredients"] for ing in value]
+        )
+        for ing in value:
+            if ing["ingredients"] not in ingredients:
+                raise serializers.ValidationError(
+                    f"Ингредиента с id {ing['ingredients']} не существует."
+                )
+            ing["ingredients"] = ingredients[ing["ingredients"]]
+        return value
+
     def validate(self, data):
         field = ("ingredients", "tags")
         for value in field:
@@ -201,25 +317,82 @@ class RecipeSerializer(serializers.ModelSerializer):
 
         return recipe
 
+    @staticmethod
+    def update_ingredients_in_recipe(ingredients, recipe):
+        """
+        Обновление ингредиентов рецепта по разнице с текущими.
+
+        Удаляются, изменяются и добавляются только те строки, которые
+        действительно поменялись. Возвращает True, если были изменения.
+        """
+        current = {
+            recipe_ingredient.ingredients_id: recipe_ingredient
+            for recipe_ingredient in recipe.recipes.all()
+        }
+        amounts = {ing["ingredients"].pk: ing["amount"] for ing in ingredients}
+
+        to_delete = [
+            recipe_ingredient.pk
+            for ingredient_id, recipe_ingredient in current.items()
+            if ingredient_id not in amounts
+        ]
+        to_update = []
+        for ingredient_id, amount in amounts.items():
+            recipe_ingredient = current.get(ingredient_id)
+            if recipe_ingredient and recipe_ingredient.amount != amount:
+                recipe_ingredient.amount = amount
+                to_update.append(recipe_ingredient)
+        to_create = [
+            ing for ing in ingredients if ing["ingredients"].pk not in current
+        ]
+
+        if to_delete:
+            RecipeIngredient.objects.filter(pk__in=to_delete).delete()
+        if to_update:
+            RecipeIngredient.objects.bulk_update(to_update, ["amount"])
+        if to_create:
+            RecipeSerializer.create_ingredients_in_recipe(to_create, recipe)
+        return bool(to_delete or to_update or to_create)
+
     def update(self, instance, validated_data):
         ingredients = validated_data.pop("ingredients")
         tags = validated_data.pop("tags")
-        instance.tags.set(tags)
-        instance.ingredients.clear()
-        self.create_ingredients_in_recipe(ingredients, instance)
+        with transaction.atomic():
+            instance.tags.set(tags)
+            if self.update_ingredients_in_recipe(ingredients, instance):
+                transaction.on_commit(
+                    lambda: bump_recipe_shopping_carts(instance.pk)
+                )
+            changed_fields = [
+                field for field, value in validated_data.items()
+                if getattr(instance, field) != value
+            ]
+            for field in changed_fields:
+                setattr(instance, field, validated_data[field])
+            if changed_fields:
+                instance.save(update_fields=changed_fields)
 
-        return super().update(instance, validated_data)
+        return instance
 
     def to_representation(self, instance):
+        request = self.context.get("request")
+        if not hasattr(instance, "is_favorited"):
+            # После записи связи рецепта нужно перечитать одним запросом,
+            # а объекты из with_related уже загружены целиком.
+            instance = Recipe.objects.with_related(request.user).get(
+                pk=instance.pk
+            )
         serializer = RecipeSafeMethodSerializer(
-            instance, context={"request": self.context.get("request")}
+            instance, context={"request": request}
         )
         return serializer.data
 
 
 class MiniRecipeSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta:
-        fields = ("id", "name", "image", "cooking_time")
+        fields = ("id", "name", "image", "image_variants", "cooking_time")
         model = Recipe
 
 
@@ -236,25 +409,24 @@ class RecipeFavoriteSerializer(serializers.ModelSerializer):
         return serializer.data
 
 
-class SubscribeUserSafeMethodSerializer(UserSerializer):
+class SubscribeUserSafeMethodSerializer(
+    TimedSerializerMixin, UserSerializer
+):
     recipes = serializers.SerializerMethodField(read_only=True)
-    recipes_count = serializers.SerializerMethodField(read_only=True)
 
     class Meta(UserSerializer.Meta):
         model = User
         fields = UserSerializer.Meta.fields + ["recipes", "recipes_count"]
-
-    def get_recipes_count(self, obj):
-        return obj.recipes.count()
+        list_serializer_class = TimedListSerializer
 
     def get_recipes(self, obj):
-        count = self.context.get("request").GET.get("recipes_limit")
-        recipes = obj.recipes.all()
-        if count:
-            try:
-                recipes = recipes[: int(count)]
-            except ValueError:
-                pass
+        if hasattr(obj, "limited_recipes"):
+            recipes = obj.limited_recipes
+        else:
+            recipes = obj.recipes.all()
+            count = get_recipes_limit(self.context.get("request"))
+            if count is not None:
+                recipes = recipes[:count]
         serializer = MiniRecipeSerializer(recipes, many=True, read_only=True)
         return serializer.data
 
@@ -291,3 +463,23 @@ class ShoppingCartSerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         serializer = MiniRecipeSerializer(instance.recipe)
         return serializer.data
+
+
+class BulkRecipesSerializer(serializers.Serializer):
+    """Список id рецептов для массового добавления и удаления."""
+
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=BULK_RECIPES_MAX_LENGTH,
+    )
+
+    def validate_recipes(self, value):
+        return list(dict.fromkeys(value))
+
+
+class ShoppingCartExportSerializer(serializers.ModelSerializer):
+    class Meta:
+        fields = ("id", "status", "error", "created_at", "finished_at")
+        read_only_fields = fields
+        model = ShoppingCartExport
@@ -2,12 +2,23 @@ from django.urls import include, path
 from django.views.generic import TemplateView
 from rest_framework.routers import DefaultRouter
 
-from .views import IngredientViewSet, RecipeViewSet, TagViewSet, UsersViewSet
+from .views import (
+    IngredientViewSet,
+    RecipeViewSet,
+    ShoppingCartExportViewSet,
+    TagViewSet,
+    UsersViewSet,
+)
 
 
 router_v_1 = DefaultRouter()
 router_v_1.register("ingredients", IngredientViewSet, basename="ingredients")
 router_v_1.register("recipes", RecipeViewSet, basename="recipes")
+router_v_1.register(
+    "shopping_cart_exports",
+    ShoppingCartExportViewSet,
+    basename="shopping-cart-exports",
+)
 router_v_1.register("tags", TagViewSet, basename="tags")
 router_v_1.register("users", UsersViewSet, basename="users")
 
@@ -1,54 +1,175 @@
-import reportlab
 import io
+import uuid
+from datetime import timedelta
+
 from django.conf import settings
-from django.shortcuts import get_object_or_404
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db.models import Q, Sum
+from django.http import Http404
+from django.utils import timezone
 from django.views.generic.base import RedirectView
+from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.pdfbase import pdfmetrics
 
-from foodgram.models import Recipe
+from api.instrumentation import timed
+from api.metrics import record_cache_lookup
+from backend.constants import (
+    EXPORT_RETENTION,
+    EXPORT_STALE_AFTER,
+    SHOPPING_CART_PDF_CACHE_TIMEOUT,
+)
+from foodgram.cache import get_catalog_version, get_shopping_cart_version
+from foodgram.models import RecipeIngredient, ShoppingCartExport
+from foodgram.short_links import resolve_short_code
+
+FONT_NAME = "DejaVuSans"
+
+pdfmetrics.registerFont(
+    TTFont(FONT_NAME, str(settings.BASE_DIR / "fonts" / "DejaVuSans.ttf"))
+)
 
 
 class SearchRedirectView(RedirectView):
     """Перенаправление коротких ссылок на страницу рецепта."""
 
     def get_redirect_url(self, *args, **kwargs):
-        full_path = (self.request.get_full_path()).replace("/s", "", 1)
-        link = get_object_or_404(Recipe, short_url=full_path)
-        url = self.request.build_absolute_uri(f"/api/recipes/{link.pk}/")
-        return url
+        pk = resolve_short_code(kwargs["short_code"])
+        if pk is None:
+            raise Http404
+        return self.request.build_absolute_uri(f"/recipes/{pk}")
+
+
+def get_shopping_cart_ingredients(user):
+    """Суммарное количество каждого ингредиента из списка покупок."""
+    return (
+        RecipeIngredient.objects.filter(recipe__shopping_carts__user=user)
+        .values("ingredients")
+        .annotate(total_amount=Sum("amount"))
+        .values_list(
+            "ingredients",
+            "ingredients__name",
+            "ingredients__measurement_unit",
+            "total_amount",
+        )
+        .order_by("ingredients__name")
+    )
 
 
-def create_shopping_cart_pdf(shopping_cart_ingredients):
+def create_shopping_cart_pdf(shopping_cart_ingredients, output):
     """Создание списка покупок для последующей отправки."""
-    LAST_RECODR_IN_PAGE = 23
-    reportlab.rl_config.TTFSearchPath.append(str(settings.BASE_DIR) + "fonts/")
-    pdfmetrics.registerFont(TTFont("DejaVuSans", "DejaVuSans.ttf"))
-    buffer = io.BytesIO()
-    shopping_cart = canvas.Canvas(buffer)
+    TOP_RECORD_POSITION = 770
+    BOTTOM_RECORD_POSITION = 50
+    RECORD_HEIGHT = 30
+    shopping_cart = canvas.Canvas(output, pagesize=A4)
 
-    shopping_cart.setFont("DejaVuSans", 15)
+    shopping_cart.setFont(FONT_NAME, 15)
     shopping_cart.drawString(230, 800, "Список покупок")
 
-    shopping_cart.setFont("DejaVuSans", 12)
-    count = 1
-    position_record = 770
+    shopping_cart.setFont(FONT_NAME, 12)
+    position_record = TOP_RECORD_POSITION
 
-    for ing in shopping_cart_ingredients:
+    for count, ing in enumerate(shopping_cart_ingredients, 1):
+        if position_record < BOTTOM_RECORD_POSITION:
+            shopping_cart.showPage()
+            shopping_cart.setFont(FONT_NAME, 12)
+            position_record = TOP_RECORD_POSITION
         shopping_cart.drawString(
             50, position_record, f"{count}. {ing[1]} - {ing[3]}{ing[2]}"
         )
-        if count == LAST_RECODR_IN_PAGE:
-            shopping_cart.showPage()
-        position_record -= 30
-        count += 1
-        if count == 23:
-            position_record = 770
-            shopping_cart.showPage()
+        position_record -= RECORD_HEIGHT
 
     shopping_cart.showPage()
     shopping_cart.save()
-    buffer.seek(0)
 
-    return buffer
+
+def write_shopping_cart_pdf(user, output):
+    """
+    Запись PDF списка покупок пользователя в output.
+
+    Готовый файл кэшируется по версии списка покупок и справочника
+    ингредиентов, поэтому повторное скачивание не перерисовывает его.
+    """
+    key = ":".join((
+        "shopping-cart-pdf",
+        str(user.pk),
+        get_shopping_cart_version(user.pk),
+        str(get_catalog_version("ingredients")),
+    ))
+    content = cache.get(key)
+    record_cache_lookup("shopping_cart_pdf", content is not None)
+    if content is None:
+        buffer = io.BytesIO()
+        ingredients = list(get_shopping_cart_ingredients(user))
+        with timed("pdf"):
+            create_shopping_cart_pdf(ingredients, buffer)
+        content = buffer.getvalue()
+        cache.set(key, content, SHOPPING_CART_PDF_CACHE_TIMEOUT)
+    output.write(content)
+
+
+def claim_shopping_cart_export(stale_after=EXPORT_STALE_AFTER):
+    """
+    Захват самой старой ожидающей или зависшей выгрузки.
+
+    Зависшей считается выгрузка, которая выполняется дольше
+    stale_after секунд: её обработчик, скорее всего, остановился.
+    Статус меняется условным UPDATE, поэтому одну выгрузку не заберут
+    два обработчика даже на базах без SELECT ... FOR UPDATE.
+    """
+    claimable = ShoppingCartExport.objects.filter(
+        Q(status=ShoppingCartExport.PENDING)
+        | Q(
+            status=ShoppingCartExport.RUNNING,
+            started_at__lt=timezone.now() - timedelta(seconds=stale_after),
+        )
+    )
+    for job in claimable.order_by("created_at")[:10]:
+        claimed = claimable.filter(pk=job.pk).update(
+            status=ShoppingCartExport.RUNNING, started_at=timezone.now()
+        )
+        if claimed:
+            return ShoppingCartExport.objects.select_related("user").get(
+                pk=job.pk
+            )
+    return None
+
+
+def run_shopping_cart_export(job):
+    """Формирование PDF для захваченной выгрузки."""
+    try:
+        buffer = io.BytesIO()
+        write_shopping_cart_pdf(job.user, buffer)
+        job.file.save(
+            f"{uuid.uuid4().hex}.pdf", ContentFile(buffer.getvalue()),
+            save=False
+        )
+        job.status = ShoppingCartExport.DONE
+    except Exception as error:
+        job.status = ShoppingCartExport.FAILED
+        job.error = str(error)
+    job.finished_at = timezone.now()
+    job.save(update_fields=["file", "status", "error", "finished_at"])
+    return job
+
+
+def remove_expired_shopping_cart_exports(retention=EXPORT_RETENTION):
+    """
+    Удаление завершённых выгрузок старше retention секунд вместе
+    с файлами. Возвращает число удалённых выгрузок.
+    """
+    expired = dict(
+        ShoppingCartExport.objects.filter(
+            status__in=(ShoppingCartExport.DONE, ShoppingCartExport.FAILED),
+            finished_at__lt=timezone.now() - timedelta(seconds=retention),
+        ).values_list("pk", "file")
+    )
+    ShoppingCartExport.objects.filter(pk__in=expired).delete()
+    # Файлы удаляются после строк: лишний файл безопаснее ссылки
+    # на удалённый.
+    storage = ShoppingCartExport._meta.get_field("file").storage
+    for name in filter(None, expired.values()):
+        storage.delete(name)
+    return len(expired)
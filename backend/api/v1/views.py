@@ -1,53 +1,90 @@
-from django.db.models import Sum
+from django.db.models import (
+    BooleanField, F, Prefetch, Value, Window
+)
+from django.db.models.functions import RowNumber
 from django.shortcuts import get_object_or_404
-from django.http import FileResponse
+from django.http import FileResponse, HttpResponse
+from django.utils.http import content_disposition_header
 from django_filters.rest_framework import DjangoFilterBackend
 from djoser.views import UserViewSet
-from rest_framework import viewsets, status
+from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
-from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
 
 from .filters import RecipeFilters, IngredientsFilters
+from .mixins import CatalogCacheMixin
+from .pagination import RecipePagination, UserPagination
+from .parsers import IMAGE_PARSER_CLASSES, get_image_data
 from .permissions import IsAuthorOrReadOnly
 from .serializers import (
+    BulkRecipesSerializer,
     IngredientSerializer,
     PutAvatarSerializer,
     RecipeFavoriteSerializer,
+    RecipeImageSerializer,
     RecipeSerializer,
     SubscribeUserSerializer,
     SubscribeUserSafeMethodSerializer,
     ShoppingCartSerializer,
+    ShoppingCartExportSerializer,
     TagSerializer,
     UserSerializer,
+    get_recipes_limit,
+)
+from .utils import write_shopping_cart_pdf
+from backend.constants import (
+    INGREDIENT_AUTOCOMPLETE_DEFAULT_LIMIT,
+    INGREDIENT_AUTOCOMPLETE_MAX_LIMIT,
 )
-from .utils import create_shopping_cart_pdf
+from foodgram.autocomplete import ingredient_index
+from foodgram.bulk import add_recipes, remove_recipes
 from foodgram.models import (
     Favorite,
     Ingredient,
     Recipe,
-    RecipeIngredient,
     ShoppingCart,
+    ShoppingCartExport,
     Tag,
 )
 from users.models import User, Subscriptions
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(CatalogCacheMixin, viewsets.ReadOnlyModelViewSet):
     """API для ингредиентов."""
 
+    catalog_name = "ingredients"
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     filter_backends = (DjangoFilterBackend,)
     filterset_class = IngredientsFilters
     pagination_class = None
 
+    @action(detail=False, methods=["GET"])
+    def autocomplete(self, request):
+        """
+        Автодополнение ингредиентов по индексу в памяти процесса.
+
+        Сначала возвращаются ингредиенты, название которых начинается
+        с name, затем, для запросов от трёх символов, содержащие его,
+        не более limit штук.
+        """
+        try:
+            limit = int(request.query_params["limit"])
+        except (KeyError, ValueError):
+            limit = INGREDIENT_AUTOCOMPLETE_DEFAULT_LIMIT
+        limit = min(max(limit, 1), INGREDIENT_AUTOCOMPLETE_MAX_LIMIT)
+        return Response(
+            ingredient_index.search(
+                request.query_params.get("name", ""), limit
+            )
+        )
+
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(CatalogCacheMixin, viewsets.ReadOnlyModelViewSet):
     """API для тегов."""
 
+    catalog_name = "tags"
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     pagination_class = None
@@ -60,11 +97,15 @@ class RecipeViewSet(viewsets.ModelViewSet):
     serializer_class = RecipeSerializer
     permission_classes = (IsAuthorOrReadOnly,)
     http_method_names = ["get", "post", "head", "patch", "delete"]
-    pagination_class = PageNumberPagination
-    PageNumberPagination.page_size_query_param = 'limit'
+    pagination_class = RecipePagination
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilters
 
+    def get_queryset(self):
+        if self.action in ("list", "retrieve"):
+            return Recipe.objects.with_related(self.request.user)
+        return Recipe.objects.all()
+
     @action(detail=True, methods=["POST"])
     def favorite(self, request, pk):
         """Получение и удаление на рецепт."""
@@ -96,11 +137,32 @@ class RecipeViewSet(viewsets.ModelViewSet):
             status=status.HTTP_204_NO_CONTENT
         )
 
+    @action(
+        detail=True, methods=["PATCH"], parser_classes=IMAGE_PARSER_CLASSES
+    )
+    def image(self, request, pk):
+        """
+        Замена изображения рецепта.
+
+        Кроме base64 в JSON принимает файл в multipart/form-data
+        или изображение телом запроса.
+        """
+        recipe = self.get_object()
+        serializer = RecipeImageSerializer(
+            recipe,
+            data=get_image_data(request, "image"),
+            context={"request": request},
+        )
+        serializer.is_valid(raise_exception=True)
+        recipe.image = serializer.validated_data["image"]
+        recipe.save(update_fields=["image"])
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
     @action(detail=True, methods=["GET"], url_path="get-link")
     def get_link(self, request, pk):
         """Получение короткой ссылки на рецепт."""
         recipe_link = get_object_or_404(Recipe, pk=pk).short_url
-        short_link = self.request.build_absolute_uri(recipe_link)
+        short_link = self.request.build_absolute_uri(f"/s{recipe_link}")
         return Response(
             ({"short-link": short_link}), status=status.HTTP_200_OK
         )
@@ -137,31 +199,100 @@ class RecipeViewSet(viewsets.ModelViewSet):
             status=status.HTTP_204_NO_CONTENT
         )
 
+    def bulk_change(self, request, model, change):
+        """Массовое изменение связей с рецептами и статус каждого id."""
+        serializer = BulkRecipesSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = change(
+            model, request.user, serializer.validated_data["recipes"]
+        )
+        return Response(
+            {
+                "recipes": [
+                    {"id": pk, "status": result}
+                    for pk, result in results.items()
+                ]
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @action(
+        detail=False,
+        methods=["POST"],
+        permission_classes=(IsAuthenticated,),
+    )
+    def bulk_favorite(self, request):
+        """Добавление и удаление нескольких рецептов в избранном."""
+        return self.bulk_change(request, Favorite, add_recipes)
+
+    @bulk_favorite.mapping.delete
+    def bulk_delete_favorite(self, request):
+        return self.bulk_change(request, Favorite, remove_recipes)
+
+    @action(
+        detail=False,
+        methods=["POST"],
+        permission_classes=(IsAuthenticated,),
+    )
+    def bulk_shopping_cart(self, request):
+        """Добавление и удаление нескольких рецептов в списке покупок."""
+        return self.bulk_change(request, ShoppingCart, add_recipes)
+
+    @bulk_shopping_cart.mapping.delete
+    def bulk_delete_shopping_cart(self, request):
+        return self.bulk_change(request, ShoppingCart, remove_recipes)
+
     @action(
         detail=False,
         methods=["GET"],
+        permission_classes=(IsAuthenticated,),
     )
     def download_shopping_cart(self, request):
         """Скачивание списка покупок."""
-
-        sc_ingredients = (
-            RecipeIngredient.objects.filter(
-                recipe__shopping_carts__user=self.request.user
-            )
-            .values("ingredients")
-            .annotate(total_amount=Sum("amount"))
-            .values_list(
-                "ingredients",
-                "ingredients__name",
-                "ingredients__measurement_unit",
-                "total_amount",
-            )
+        response = HttpResponse(content_type="application/pdf")
+        response["Content-Disposition"] = content_disposition_header(
+            True, f"shopping cart {self.request.user}.pdf"
         )
+        write_shopping_cart_pdf(self.request.user, response)
+        return response
+
 
-        shopping_cart = create_shopping_cart_pdf(sc_ingredients)
+class ShoppingCartExportViewSet(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    API для фоновой выгрузки списка покупок.
 
+    POST ставит выгрузку в очередь, которую разбирает команда
+    export_worker, GET возвращает её статус, а download отдаёт
+    готовый файл.
+    """
+
+    serializer_class = ShoppingCartExportSerializer
+    permission_classes = (IsAuthenticated,)
+    pagination_class = None
+
+    def get_queryset(self):
+        return ShoppingCartExport.objects.filter(user=self.request.user)
+
+    def create(self, request, *args, **kwargs):
+        export = ShoppingCartExport.objects.create(user=self.request.user)
+        serializer = self.get_serializer(export)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=["GET"])
+    def download(self, request, pk):
+        """Скачивание готового списка покупок."""
+        export = self.get_object()
+        if export.status != ShoppingCartExport.DONE:
+            return Response(
+                "Список покупок ещё не готов.",
+                status=status.HTTP_409_CONFLICT,
+            )
         return FileResponse(
-            shopping_cart,
+            export.file.open("rb"),
             as_attachment=True,
             filename=f"shopping cart {self.request.user}.pdf",
         )
@@ -171,7 +302,7 @@ class UsersViewSet(UserViewSet):
     """API для юзеров."""
 
     queryset = User.objects.all()
-    pagination_class = LimitOffsetPagination
+    pagination_class = UserPagination
     serializer_class = UserSerializer
 
     @action(
@@ -221,7 +352,27 @@ class UsersViewSet(UserViewSet):
     )
     def subscriptions(self, request):
         """Список подписок текущего пользователя."""
-        queryset = User.objects.filter(following__user=self.request.user)
+        recipes = Recipe.objects.annotate(
+            row_number=Window(
+                RowNumber(),
+                partition_by=F("author"),
+                order_by=(F("created_at").desc(), F("pk").desc()),
+            )
+        )
+        recipes_limit = get_recipes_limit(request)
+        if recipes_limit is not None:
+            recipes = recipes.filter(row_number__lte=recipes_limit)
+        queryset = (
+            User.objects.filter(following__user=self.request.user)
+            .annotate(is_subscribed=Value(True, output_field=BooleanField()))
+            .prefetch_related(
+                Prefetch(
+                    "recipes",
+                    queryset=recipes.order_by("-created_at", "-pk"),
+                    to_attr="limited_recipes",
+                )
+            )
+        )
         page = self.paginate_queryset(queryset)
 
         serializer = SubscribeUserSafeMethodSerializer(
@@ -234,19 +385,24 @@ class UsersViewSet(UserViewSet):
         methods=["PUT"],
         url_path="me/avatar",
         permission_classes=(IsAuthenticated,),
+        parser_classes=IMAGE_PARSER_CLASSES,
     )
     def avatar(self, request):
         """Создание и удаление аватара текущего пользователя."""
         user = self.request.user
-        serializer = PutAvatarSerializer(user, data=request.data)
+        serializer = PutAvatarSerializer(
+            user, data=get_image_data(request, "avatar")
+        )
         serializer.is_valid(raise_exception=True)
         user.avatar = serializer.validated_data.get("avatar")
-        user.save()
+        user.save(update_fields=["avatar"])
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     @avatar.mapping.delete
     def delete_avatar(self, request, **kwargs):
-        self.request.user.avatar.delete()
+        user = self.request.user
+        user.avatar = None
+        user.save(update_fields=["avatar"])
         return Response(
             "Аватар успешно удален", status=status.HTTP_204_NO_CONTENT
         )
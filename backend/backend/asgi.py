@@ -3,5 +3,10 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+# Под ASGI частые запросы чтения обслуживают асинхронные представления.
+os.environ.setdefault('ROOT_URLCONF', 'backend.asgi_urls')
+# ASGI-сервис работает рядом с синхронным и видит их общие версии
+# справочников, токены и ответы только через общий кэш.
+os.environ.setdefault('REQUIRE_SHARED_CACHE', 'True')
 
 application = get_asgi_application()
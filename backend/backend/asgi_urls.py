@@ -0,0 +1,57 @@
+from django.urls import path
+
+from api.v1 import async_views
+from api.v1.urls import router_v_1
+from .urls import urlpatterns as sync_urlpatterns
+
+sync_views = {url.name: url.callback for url in router_v_1.urls}
+
+# Адреса и имена совпадают с синхронными, остальные маршруты общие.
+urlpatterns = [
+    path(
+        "api/recipes/",
+        async_views.RecipeListView.as_view(
+            sync_view=sync_views["recipes-list"]
+        ),
+        name="recipes-list",
+    ),
+    path(
+        "api/recipes/<int:pk>/",
+        async_views.RecipeDetailView.as_view(
+            sync_view=sync_views["recipes-detail"]
+        ),
+        name="recipes-detail",
+    ),
+    path(
+        "api/tags/",
+        async_views.TagListView.as_view(sync_view=sync_views["tags-list"]),
+        name="tags-list",
+    ),
+    path(
+        "api/tags/<int:pk>/",
+        async_views.TagDetailView.as_view(
+            sync_view=sync_views["tags-detail"]
+        ),
+        name="tags-detail",
+    ),
+    path(
+        "api/ingredients/",
+        async_views.IngredientListView.as_view(
+            sync_view=sync_views["ingredients-list"]
+        ),
+        name="ingredients-list",
+    ),
+    path(
+        "api/ingredients/<int:pk>/",
+        async_views.IngredientDetailView.as_view(
+            sync_view=sync_views["ingredients-detail"]
+        ),
+        name="ingredients-detail",
+    ),
+    path(
+        "s/<str:short_code>/",
+        async_views.ShortLinkView.as_view(),
+        name="short-link",
+    ),
+    *sync_urlpatterns,
+]
@@ -4,6 +4,11 @@
 INGREDIENT_NAME_FIELD_MAX_LENGTH = 128
 MEANSUREMENT_UNIT_MAX_LENGTH = 64
 
+INGREDIENT_AUTOCOMPLETE_DEFAULT_LIMIT = 10
+INGREDIENT_AUTOCOMPLETE_MAX_LIMIT = 50
+INGREDIENT_AUTOCOMPLETE_VERSION_CHECK_INTERVAL = 1
+INGREDIENT_AUTOCOMPLETE_SUBSTRING_MIN_LENGTH = 3
+
 # TAG
 TAG_FIELD_MAX_LENGTH = 32
 
@@ -12,12 +17,45 @@ RECIPE_FIELD_MAX_LENGTH = 256
 MIN_VALUE_VALIDATOR_COOKING_TIME = 1
 MAX_VALUE_VALIDATOR_COOKING_TIME = 32000
 SHORT_URL_MAX_LENGTH = 12
-LENGTH_STRING_FOR_SHORT_LINK = 10
+LENGTH_STRING_FOR_SHORT_LINK = 6
+SHORT_LINK_LEGACY_CACHE_TIMEOUT = 60 * 60 * 24
+BULK_RECIPES_MAX_LENGTH = 100
 
 # RECIPEINGREDIENT
 MIN_VALUE_VALIDATOR_AMOUNT = 1
 MAX_VALUE_VALIDATOR_AMOUNT = 32000
 
+# SHOPPINGCARTEXPORT
+EXPORT_STATUS_MAX_LENGTH = 16
+EXPORT_STALE_AFTER = 60 * 10
+EXPORT_RETENTION = 60 * 60 * 24
+EXPORT_CLEANUP_INTERVAL = 60 * 10
+
+# IMAGES
+IMAGE_MAX_SIDE = 2048
+IMAGE_MAX_PIXELS = 40_000_000
+IMAGE_QUALITY = 85
+IMAGE_VARIANT_SIZES = {"small": 320, "medium": 640}
+IMAGE_VARIANT_WORKERS = 2
+IMAGE_UPLOAD_MAX_SIZE = 20 * 1024 * 1024
+
+# PAGINATION
+MAX_PAGE_SIZE = 100
+
+# METRICS
+REQUEST_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+REQUEST_QUERIES_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# CACHE
+CATALOG_CACHE_TIMEOUT = 60 * 60 * 24
+SHOPPING_CART_PDF_CACHE_TIMEOUT = 60 * 60 * 24
+AUTH_TOKEN_CACHE_TIMEOUT = 60 * 5
+AUTH_TOKEN_LOCAL_CACHE_TIMEOUT = 10
+AUTH_TOKEN_LOCAL_CACHE_SIZE = 1024
+AUTH_TOKEN_TOMBSTONE_TIMEOUT = 10
+
 # users models
 USER_NAME_FIELD_MAX_LENGTH = 150
 EMAIL_FIELD_MAX_LENGTH = 254
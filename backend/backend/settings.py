@@ -2,6 +2,7 @@ import os
 from pathlib import Path
 
 from dotenv import load_dotenv
+from django.core.exceptions import ImproperlyConfigured
 import django.core.management.utils
 
 load_dotenv()
@@ -14,6 +15,17 @@ SECRET_KEY = os.getenv(
 
 DEBUG = os.getenv("DEBUG", "False") == "True"
 
+# Ключ перемешивания коротких ссылок: без него коды предсказуемы.
+SHORT_LINK_KEY = os.getenv("SHORT_LINK_KEY") or (
+    "3781927463" if DEBUG else None
+)
+
+if not (SHORT_LINK_KEY or "").isdigit():
+    raise ImproperlyConfigured(
+        "Задайте SHORT_LINK_KEY — случайное целое число, например "
+        "python -c 'import secrets; print(secrets.randbits(48))'."
+    )
+
 ALLOWED_HOSTS = os.getenv("ALLOWED_HOSTS", "127.0.0.1 localhost").split()
 
 CSRF_TRUSTED_ORIGINS = os.getenv("CSRF_TRUSTED_ORIGINS", "https://example.com").split()
@@ -35,6 +47,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api.instrumentation.ServerTimingMiddleware",
+    "api.metrics.MetricsMiddleware",
+    "api.slow_queries.SlowQueryMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -44,7 +59,7 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
-ROOT_URLCONF = "backend.urls"
+ROOT_URLCONF = os.getenv("ROOT_URLCONF", "backend.urls")
 
 TEMPLATES = [
     {
@@ -83,6 +98,35 @@ else:
         }
     }
 
+CACHE_BACKEND = os.getenv(
+    "CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"
+)
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": os.getenv("CACHE_LOCATION", "/tmp/foodgram_cache"),
+    }
+}
+
+# Версии списков покупок и справочников, токены и готовые ответы
+# читают все сервисы (backend, backend_async, export_worker), поэтому
+# при раздельном развёртывании кэш должен быть общим для них.
+LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.dummy.DummyCache",
+    "django.core.cache.backends.filebased.FileBasedCache",
+    "django.core.cache.backends.locmem.LocMemCache",
+)
+
+if (
+    os.getenv("REQUIRE_SHARED_CACHE", "False") == "True"
+    and CACHE_BACKEND in LOCAL_CACHE_BACKENDS
+):
+    raise ImproperlyConfigured(
+        f"Кэш {CACHE_BACKEND} виден только одному контейнеру: задайте "
+        "в CACHE_BACKEND и CACHE_LOCATION общий для всех сервисов кэш."
+    )
+
 AUTH_USER_MODEL = "users.User"
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -121,7 +165,7 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.AllowAny",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "api.authentication.CachedTokenAuthentication",
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 6,
@@ -140,3 +184,28 @@ DJOSER = {
         "current_user": "api.v1.serializers.UserSerializer",
     },
 }
+
+SERVER_TIMING_SAMPLE_RATE = float(
+    os.getenv("SERVER_TIMING_SAMPLE_RATE", "0.1")
+)
+
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "0"))
+SLOW_QUERY_EXPLAIN_RATE = float(os.getenv("SLOW_QUERY_EXPLAIN_RATE", "0.1"))
+SLOW_QUERY_LOG = os.getenv(
+    "SLOW_QUERY_LOG", str(BASE_DIR / "slow_queries.jsonl")
+)
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "api.instrumentation": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
@@ -1,11 +1,15 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from api.metrics import metrics_view
 from api.v1.utils import SearchRedirectView
 
 
 urlpatterns = [
-    path("s/<str:pk>/", SearchRedirectView.as_view()),
+    path(
+        "s/<str:short_code>/", SearchRedirectView.as_view(), name="short-link"
+    ),
     path("admin/", admin.site.urls),
     path("api/", include("api.v1.urls")),
+    path("metrics", metrics_view),
 ]
@@ -5,3 +5,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+from foodgram.autocomplete import ingredient_index  # noqa: E402
+
+ingredient_index.warm_up()
@@ -5,7 +5,8 @@ from .models import (
     Ingredient, Recipe,
     Tag,
     Favorite,
-    ShoppingCart
+    ShoppingCart,
+    ShoppingCartExport,
 )
 
 
@@ -47,6 +48,7 @@ class RecipeAdmin(admin.ModelAdmin):
         "name",
         "author",
         "text",
+        "favorites_count",
     )
     search_fields = ("author__username", "name", "tags__name")
     list_filter = ("tags__name",)
@@ -58,8 +60,14 @@ class IngredientsAdmin(admin.ModelAdmin):
     search_fields = ("name",)
 
 
+class ShoppingCartExportAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "status", "created_at", "finished_at")
+    list_filter = ("status",)
+
+
 admin.site.register(Tag)
 admin.site.register(Ingredient, IngredientsAdmin)
 admin.site.register(Favorite)
 admin.site.register(ShoppingCart)
 admin.site.register(Recipe, RecipeAdmin)
+admin.site.register(ShoppingCartExport, ShoppingCartExportAdmin)
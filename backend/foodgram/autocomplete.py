@@ -0,0 +1,106 @@
+import bisect
+import threading
+import time
+
+from django.db import DatabaseError
+
+from backend.constants import (
+    INGREDIENT_AUTOCOMPLETE_SUBSTRING_MIN_LENGTH,
+    INGREDIENT_AUTOCOMPLETE_VERSION_CHECK_INTERVAL,
+)
+from foodgram.cache import get_catalog_version
+from foodgram.models import Ingredient
+
+
+class IngredientIndex:
+    """
+    Индекс ингредиентов в памяти процесса для автодополнения.
+
+    Названия хранятся отсортированными в нижнем регистре, поэтому
+    совпадения по началу строки находятся бинарным поиском, а
+    совпадения по подстроке добавляются после них до лимита.
+    Индекс перестраивается, когда меняется версия справочника
+    ингредиентов в общем кэше. Версия читается из кэша не чаще раза
+    в INGREDIENT_AUTOCOMPLETE_VERSION_CHECK_INTERVAL секунд, а
+    изменения в своём процессе сбрасывают проверку сигналом сразу.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = None
+        self._keys = None
+        self._items = None
+
+    def build(self, version=None):
+        """Построение индекса по текущему содержимому таблицы."""
+        if version is None:
+            version = get_catalog_version("ingredients")
+        rows = Ingredient.objects.values("id", "name", "measurement_unit")
+        entries = sorted(
+            ((row["name"].lower(), row["measurement_unit"], row["id"]), row)
+            for row in rows
+        )
+        keys = [key[0] for key, _ in entries]
+        items = [row for _, row in entries]
+        with self._lock:
+            self._version, self._keys, self._items = version, keys, items
+            self._checked_at = time.monotonic()
+        return keys, items
+
+    def invalidate(self):
+        """Сверка версии справочника при следующем поиске."""
+        with self._lock:
+            self._checked_at = None
+
+    def warm_up(self):
+        """Построение индекса при старте процесса, если база доступна."""
+        try:
+            self.build()
+        except DatabaseError:
+            pass
+
+    def _get(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._checked_at is not None and (
+                now - self._checked_at
+                < INGREDIENT_AUTOCOMPLETE_VERSION_CHECK_INTERVAL
+            ):
+                return self._keys, self._items
+        version = get_catalog_version("ingredients")
+        with self._lock:
+            if self._version == version:
+                self._checked_at = now
+                return self._keys, self._items
+        return self.build(version)
+
+    def search(self, query, limit):
+        """Не более limit ингредиентов, подходящих под запрос."""
+        query = query.strip().lower()
+        keys, items = self._get()
+        start = bisect.bisect_left(keys, query)
+        result = []
+        index = start
+        while (
+            index < len(keys)
+            and len(result) < limit
+            and keys[index].startswith(query)
+        ):
+            result.append(items[index])
+            index += 1
+        # Поиск по подстроке проходит по всем названиям, поэтому
+        # он выполняется только для достаточно длинных запросов.
+        if (
+            len(result) < limit
+            and len(query) >= INGREDIENT_AUTOCOMPLETE_SUBSTRING_MIN_LENGTH
+        ):
+            for key, item in zip(keys, items):
+                if query in key and not key.startswith(query):
+                    result.append(item)
+                    if len(result) == limit:
+                        break
+        return result
+
+
+ingredient_index = IngredientIndex()
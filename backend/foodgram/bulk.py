@@ -0,0 +1,109 @@
+from django.db import connection, transaction
+
+from users.models import User
+from .cache import bump_shopping_cart_versions
+from .counters import counter_expressions
+from .models import Favorite, Recipe, ShoppingCart
+
+ADDED = "added"
+EXISTS = "exists"
+REMOVED = "removed"
+MISSING = "missing"
+NOT_FOUND = "not_found"
+
+COUNTER_FIELDS = {
+    Favorite: "favorites_count",
+    ShoppingCart: "shopping_carts_count",
+}
+
+
+def _split(model, user, recipe_ids):
+    """
+    Найденные рецепты и те из них, что уже есть у пользователя.
+
+    Строка пользователя блокируется до конца транзакции, поэтому
+    параллельные массовые изменения одного пользователя выполняются
+    по очереди и видят результаты друг друга.
+    """
+    recipes = set(
+        Recipe.objects.filter(pk__in=recipe_ids).values_list("pk", flat=True)
+    )
+    list(User.objects.select_for_update().filter(pk=user.pk).values("pk"))
+    existing = set(
+        model.objects.filter(user=user, recipe_id__in=recipes)
+        .values_list("recipe_id", flat=True)
+    )
+    return recipes, existing
+
+
+def _delete(model, user, recipe_ids):
+    """Удаление связей одним DELETE без обработчиков post_delete."""
+    quote = connection.ops.quote_name
+    opts = model._meta
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote(opts.db_table)} "
+            f"WHERE {quote(opts.get_field('user').column)} = %s "
+            f"AND {quote(opts.get_field('recipe').column)} IN "
+            f"({', '.join(['%s'] * len(recipe_ids))})",
+            [user.pk, *recipe_ids],
+        )
+
+
+def _changed(model, user, recipe_ids):
+    """
+    Пересчёт счётчиков изменённых рецептов одним UPDATE по таблице
+    связей и одна смена версии списка покупок пользователя.
+    """
+    field = COUNTER_FIELDS[model]
+    Recipe.objects.filter(pk__in=recipe_ids).update(
+        **{field: counter_expressions()[Recipe][field]}
+    )
+    if model is ShoppingCart:
+        transaction.on_commit(lambda: bump_shopping_cart_versions([user.pk]))
+
+
+@transaction.atomic
+def add_recipes(model, user, recipe_ids):
+    """
+    Добавление рецептов в избранное или список покупок пользователя.
+
+    Сигналы при bulk_create не срабатывают, поэтому счётчики и версия
+    списка покупок обновляются явно. Строку, которую между проверкой и
+    вставкой добавил одиночный запрос, ignore_conflicts пропускает, и
+    она тоже считается добавленной: счётчики всё равно пересчитываются
+    по таблице связей.
+    Возвращает словарь {id рецепта: статус}.
+    """
+    recipes, existing = _split(model, user, recipe_ids)
+    added = recipes - existing
+    if added:
+        model.objects.bulk_create(
+            [model(user=user, recipe_id=pk) for pk in added],
+            ignore_conflicts=True,
+        )
+        _changed(model, user, added)
+    return {
+        pk: ADDED if pk in added else EXISTS if pk in recipes else NOT_FOUND
+        for pk in recipe_ids
+    }
+
+
+@transaction.atomic
+def remove_recipes(model, user, recipe_ids):
+    """
+    Удаление рецептов из избранного или списка покупок пользователя.
+
+    Связи удаляются одним DELETE, поэтому обработчики post_delete не
+    вызываются, а счётчики и версия списка покупок обновляются явно.
+    Возвращает словарь {id рецепта: статус}.
+    """
+    recipes, existing = _split(model, user, recipe_ids)
+    if existing:
+        _delete(model, user, existing)
+        _changed(model, user, existing)
+    return {
+        pk: REMOVED if pk in existing else MISSING if pk in recipes
+        else NOT_FOUND
+        for pk in recipe_ids
+    }
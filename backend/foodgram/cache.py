@@ -0,0 +1,80 @@
+import time
+import uuid
+
+from django.core.cache import cache
+
+from backend.constants import CATALOG_CACHE_TIMEOUT
+from .models import ShoppingCart, Tag
+
+CATALOG_VERSION_KEY = "catalog-version:{}"
+
+
+def get_catalog_version(name):
+    """
+    Текущая версия справочника.
+
+    Версия хранится в общем кэше как отметка времени последнего
+    изменения, поэтому одинакова для всех процессов и служит ETag.
+    """
+    key = CATALOG_VERSION_KEY.format(name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_catalog_version(name):
+    """Смена версии справочника после изменения его данных."""
+    cache.set(CATALOG_VERSION_KEY.format(name), time.time(), None)
+
+
+TAG_IDS_KEY = "tag-ids:{}"
+
+
+def get_tag_ids():
+    """
+    Идентификаторы тегов по slug.
+
+    Хранятся в кэше под ключом с версией справочника тегов и
+    устаревают сами при её смене.
+    """
+    key = TAG_IDS_KEY.format(get_catalog_version("tags"))
+    tag_ids = cache.get(key)
+    if tag_ids is None:
+        tag_ids = dict(Tag.objects.values_list("slug", "pk"))
+        cache.set(key, tag_ids, CATALOG_CACHE_TIMEOUT)
+    return tag_ids
+
+
+SHOPPING_CART_VERSION_KEY = "shopping-cart-version:{}"
+
+
+def get_shopping_cart_version(user_id):
+    """Текущая версия списка покупок пользователя."""
+    key = SHOPPING_CART_VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def bump_shopping_cart_versions(user_ids):
+    """Смена версий списков покупок после изменения их содержимого."""
+    cache.set_many(
+        {
+            SHOPPING_CART_VERSION_KEY.format(user_id): uuid.uuid4().hex
+            for user_id in user_ids
+        },
+        None,
+    )
+
+
+def bump_recipe_shopping_carts(recipe_id):
+    """Смена версий списков покупок, в которых есть рецепт."""
+    bump_shopping_cart_versions(
+        ShoppingCart.objects.filter(recipe_id=recipe_id).values_list(
+            "user_id", flat=True
+        )
+    )
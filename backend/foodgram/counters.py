@@ -0,0 +1,40 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from users.models import Subscriptions, User
+from .models import Favorite, Recipe, ShoppingCart
+
+
+def change_counter(model, pk, field, delta):
+    """Атомарное изменение счётчика F()-выражением без ухода в минус."""
+    queryset = model.objects.filter(pk=pk)
+    if delta < 0:
+        queryset = queryset.filter(**{f"{field}__gte": -delta})
+    queryset.update(**{field: F(field) + delta})
+
+
+def _count(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(count=Count("pk"))
+            .values("count")
+        ),
+        0,
+    )
+
+
+def counter_expressions():
+    """Выражения для пересчёта счётчиков по исходным таблицам."""
+    return {
+        Recipe: {
+            "favorites_count": _count(Favorite, "recipe"),
+            "shopping_carts_count": _count(ShoppingCart, "recipe"),
+        },
+        User: {
+            "recipes_count": _count(Recipe, "author"),
+            "followers_count": _count(Subscriptions, "following"),
+        },
+    }
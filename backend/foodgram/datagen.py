@@ -0,0 +1,211 @@
+import io
+import itertools
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Max
+from PIL import Image
+
+from users.models import Subscriptions, User
+from .autocomplete import ingredient_index
+from .cache import bump_catalog_version
+from .counters import counter_expressions
+from .models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+    Tag,
+)
+from .search import index_recipes
+from .short_links import encode_short_code
+
+WORDS = (
+    "борщ", "суп", "салат", "пирог", "каша", "рагу", "плов", "омлет",
+    "блины", "котлеты", "паста", "запеканка", "томатный", "куриный",
+    "грибной", "сырный", "овощной", "домашний", "быстрый", "острый",
+    "сладкий", "летний", "зимний", "праздничный", "рыбный", "мясной",
+)
+MEASUREMENT_UNITS = ("г", "кг", "мл", "л", "шт.", "ст. л.", "ч. л.")
+
+
+def _zipf_cum_weights(size, exponent):
+    """Накопленные веса степенного распределения для random.choices."""
+    return list(itertools.accumulate(
+        1 / rank ** exponent for rank in range(1, size + 1)
+    ))
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def _placeholder_image():
+    """Общее изображение для всех рецептов, сохраняемое один раз."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), (200, 120, 60)).save(buffer, "PNG")
+    field = Recipe._meta.get_field("image")
+    return field.storage.save(
+        field.upload_to + "placeholder.png", ContentFile(buffer.getvalue())
+    )
+
+
+def _sentence(rng, length):
+    return " ".join(rng.choice(WORDS) for _ in range(length)).capitalize()
+
+
+@transaction.atomic
+def generate_dataset(
+    users,
+    recipes_per_user=5,
+    ingredients_per_recipe=8,
+    tags=8,
+    ingredients=500,
+    follows_per_user=10,
+    favorites_per_user=15,
+    carts_per_user=5,
+    exponent=1.1,
+    seed=0,
+    batch_size=2000,
+):
+    """
+    Создание синтетических данных через bulk_create.
+
+    Подписки, избранное и списки покупок распределены по степенному
+    закону: немногие авторы и рецепты собирают большую часть связей.
+    Сигналы при bulk_create не срабатывают, поэтому счётчики, короткие
+    ссылки, поисковый индекс и версии справочников обновляются здесь же.
+    Возвращает количество созданных объектов по моделям.
+    """
+    rng = random.Random(seed)
+    created = {}
+
+    missing_tags = max(tags - Tag.objects.count(), 0)
+    tag_offset = Tag.objects.aggregate(last=Max("pk"))["last"] or 0
+    Tag.objects.bulk_create(
+        Tag(name=f"Тег {tag_offset + i}", slug=f"tag-{tag_offset + i}")
+        for i in range(1, missing_tags + 1)
+    )
+    created["tags"] = missing_tags
+    if missing_tags:
+        transaction.on_commit(lambda: bump_catalog_version("tags"))
+    tag_ids = list(Tag.objects.values_list("pk", flat=True))
+
+    missing_ingredients = max(ingredients - Ingredient.objects.count(), 0)
+    ingredient_offset = (
+        Ingredient.objects.aggregate(last=Max("pk"))["last"] or 0
+    )
+    for batch in _batched(range(1, missing_ingredients + 1), batch_size):
+        Ingredient.objects.bulk_create(
+            Ingredient(
+                name=f"{rng.choice(WORDS)} {ingredient_offset + i}",
+                measurement_unit=rng.choice(MEASUREMENT_UNITS),
+            )
+            for i in batch
+        )
+    created["ingredients"] = missing_ingredients
+    if missing_ingredients:
+        transaction.on_commit(lambda: bump_catalog_version("ingredients"))
+        transaction.on_commit(ingredient_index.invalidate)
+    ingredient_ids = list(Ingredient.objects.values_list("pk", flat=True))
+
+    password = make_password("benchmark")
+    user_offset = User.objects.aggregate(last=Max("pk"))["last"] or 0
+    user_ids = []
+    for batch in _batched(range(1, users + 1), batch_size):
+        user_ids.extend(user.pk for user in User.objects.bulk_create(
+            User(
+                username=f"user{user_offset + i}",
+                email=f"user{user_offset + i}@example.com",
+                first_name=rng.choice(WORDS).capitalize(),
+                last_name=rng.choice(WORDS).capitalize(),
+                password=password,
+            )
+            for i in batch
+        ))
+    created["users"] = len(user_ids)
+
+    image = _placeholder_image()
+    per_recipe = min(ingredients_per_recipe, len(ingredient_ids))
+    max_tags = len(tag_ids)
+    recipe_ids = []
+    through_tags = Recipe.tags.through
+    for batch in _batched(
+        (author for author in user_ids for _ in range(recipes_per_user)),
+        batch_size,
+    ):
+        recipes = Recipe.objects.bulk_create(
+            Recipe(
+                author_id=author,
+                name=_sentence(rng, 3),
+                text=_sentence(rng, 30),
+                image=image,
+                cooking_time=rng.randint(5, 180),
+            )
+            for author in batch
+        )
+        for recipe in recipes:
+            recipe.short_url = f"/{encode_short_code(recipe.pk)}/"
+        Recipe.objects.bulk_update(recipes, ["short_url"])
+        index_recipes(recipes)
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe_id=recipe.pk,
+                ingredients_id=ingredient,
+                amount=rng.randint(1, 500),
+            )
+            for recipe in recipes
+            for ingredient in rng.sample(ingredient_ids, per_recipe)
+        )
+        through_tags.objects.bulk_create(
+            through_tags(recipe_id=recipe.pk, tag_id=tag)
+            for recipe in recipes
+            for tag in rng.sample(tag_ids, min(rng.randint(1, 3), max_tags))
+        )
+        recipe_ids.extend(recipe.pk for recipe in recipes)
+    created["recipes"] = len(recipe_ids)
+
+    def pairs(targets, per_user, exclude_self):
+        """Пары (пользователь, цель) со степенным выбором целей."""
+        targets = targets[:]
+        rng.shuffle(targets)
+        cum_weights = _zipf_cum_weights(len(targets), exponent)
+        for user in user_ids:
+            if not targets:
+                return
+            chosen = set(rng.choices(
+                targets, cum_weights=cum_weights, k=per_user
+            ))
+            if exclude_self:
+                chosen.discard(user)
+            for target in chosen:
+                yield user, target
+
+    for model, target_field, targets, per_user in (
+        (Subscriptions, "following_id", user_ids, follows_per_user),
+        (Favorite, "recipe_id", recipe_ids, favorites_per_user),
+        (ShoppingCart, "recipe_id", recipe_ids, carts_per_user),
+    ):
+        # Повторы пар пропускаются ignore_conflicts, поэтому созданные
+        # строки считаются по таблице.
+        existing = model.objects.count()
+        for batch in _batched(
+            pairs(targets, per_user, model is Subscriptions), batch_size
+        ):
+            model.objects.bulk_create(
+                [
+                    model(user_id=user, **{target_field: target})
+                    for user, target in batch
+                ],
+                ignore_conflicts=True,
+            )
+        created[model._meta.model_name] = model.objects.count() - existing
+
+    for model, expressions in counter_expressions().items():
+        model.objects.update(**expressions)
+    return created
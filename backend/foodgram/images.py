@@ -0,0 +1,140 @@
+import io
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.dispatch import Signal
+from PIL import Image, ImageOps
+
+from backend.constants import (
+    IMAGE_MAX_PIXELS,
+    IMAGE_MAX_SIDE,
+    IMAGE_QUALITY,
+    IMAGE_VARIANT_SIZES,
+    IMAGE_VARIANT_WORKERS,
+)
+
+logger = logging.getLogger(__name__)
+
+executor = ThreadPoolExecutor(
+    max_workers=IMAGE_VARIANT_WORKERS, thread_name_prefix="image-variants"
+)
+
+SAVE_FORMATS = {"JPEG": "jpg", "PNG": "png"}
+
+# Отправляется после записи миниатюр, которая идёт через update()
+# и не вызывает post_save.
+image_variants_ready = Signal()
+
+
+def _encode(image, image_format):
+    buffer = io.BytesIO()
+    if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    image.save(buffer, image_format, quality=IMAGE_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def cap_image(file):
+    """
+    Проверка размеров загруженного изображения.
+
+    Изображения больше IMAGE_MAX_PIXELS отклоняются, а изображения,
+    у которых сторона больше IMAGE_MAX_SIDE, уменьшаются до неё.
+    Возвращает исходный файл или уменьшенную копию с тем же именем.
+    """
+    file.seek(0)
+    with Image.open(file) as image:
+        width, height = image.size
+        if width * height > IMAGE_MAX_PIXELS:
+            raise ValueError(
+                f"Изображение больше {IMAGE_MAX_PIXELS} пикселей."
+            )
+        if max(width, height) <= IMAGE_MAX_SIDE:
+            file.seek(0)
+            return file
+        image_format = image.format if image.format in SAVE_FORMATS else (
+            "JPEG"
+        )
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((IMAGE_MAX_SIDE, IMAGE_MAX_SIDE))
+        stem = posixpath.splitext(posixpath.basename(file.name))[0]
+        return ContentFile(
+            _encode(image, image_format),
+            name=f"{stem}.{SAVE_FORMATS[image_format]}",
+        )
+
+
+def create_image_variants(name):
+    """
+    Миниатюры изображения во всех размерах, в исходном формате и WebP.
+
+    Возвращает словарь с путями к файлам в хранилище, в котором
+    source — путь к исходному изображению.
+    """
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    variants = {"source": name}
+    with default_storage.open(name) as file, Image.open(file) as image:
+        image_format = image.format if image.format in SAVE_FORMATS else (
+            "JPEG"
+        )
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    for size_name, size in IMAGE_VARIANT_SIZES.items():
+        thumbnail = image.copy()
+        thumbnail.thumbnail((size, size))
+        for key, variant_format, extension in (
+            (size_name, image_format, SAVE_FORMATS[image_format]),
+            (f"{size_name}_webp", "WEBP", "webp"),
+        ):
+            path = posixpath.join(
+                directory, "thumbs", f"{stem}_{size}.{extension}"
+            )
+            if not default_storage.exists(path):
+                saved_path = default_storage.save(
+                    path, ContentFile(_encode(thumbnail, variant_format))
+                )
+                if saved_path != path:
+                    # Ту же миниатюру успела создать параллельная задача.
+                    default_storage.delete(saved_path)
+            variants[key] = path
+    return variants
+
+
+def _generate(model, pk, field_name, variants_field, name):
+    try:
+        variants = create_image_variants(name)
+        if model.objects.filter(pk=pk, **{field_name: name}).update(
+            **{variants_field: variants}
+        ):
+            image_variants_ready.send(sender=model, pk=pk)
+    except Exception:
+        logger.exception("Не удалось создать миниатюры для %s", name)
+    finally:
+        connections.close_all()
+
+
+def schedule_image_variants(instance, field_name, variants_field):
+    """
+    Постановка создания миниатюр в фоновый пул потоков.
+
+    Задача запускается после фиксации транзакции и только если
+    изображение поменялось с момента прошлой генерации.
+    """
+    name = getattr(instance, field_name).name or ""
+    variants = getattr(instance, variants_field) or {}
+    if variants.get("source", "") == name:
+        return
+    model = type(instance)
+    if not name:
+        model.objects.filter(pk=instance.pk).update(**{variants_field: {}})
+        return
+    transaction.on_commit(
+        lambda: executor.submit(
+            _generate, model, instance.pk, field_name, variants_field, name
+        )
+    )
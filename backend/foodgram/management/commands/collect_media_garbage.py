@@ -0,0 +1,98 @@
+import posixpath
+from collections import Counter
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from foodgram.models import Recipe
+from users.models import User
+
+MEDIA_DIRECTORIES = ("foodgram/blobs", "foodgram/recipe", "foodgram/avatar")
+
+
+def walk(directory):
+    """Все файлы каталога хранилища, включая вложенные."""
+    if not default_storage.exists(directory):
+        return
+    directories, files = default_storage.listdir(directory)
+    for name in files:
+        yield posixpath.join(directory, name)
+    for name in directories:
+        yield from walk(posixpath.join(directory, name))
+
+
+def is_referenced(name):
+    """
+    Ссылается ли на файл хоть одна запись в базе.
+
+    Миниатюры thumbs/<stem>_<size>.<ext> принадлежат исходному файлу
+    <stem>.<ext> из родительского каталога.
+    """
+    directory, filename = posixpath.split(name)
+    if posixpath.basename(directory) == "thumbs":
+        stem = posixpath.splitext(filename)[0].rpartition("_")[0]
+        lookup = "startswith"
+        name = posixpath.join(posixpath.dirname(directory), f"{stem}.")
+    else:
+        lookup = "exact"
+    return any(
+        model.objects.filter(**{f"{field_name}__{lookup}": name}).exists()
+        for model, field_name in ((Recipe, "image"), (User, "avatar"))
+    )
+
+
+class Command(BaseCommand):
+    help = "Delete media files that no recipe or user references"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Only list files that would be deleted.",
+        )
+        parser.add_argument(
+            "--min-age", type=int, default=3600,
+            help="Keep files younger than this many seconds.",
+        )
+
+    def handle(self, **options):
+        references = Counter()
+        for model, field_name, variants_field in (
+            (Recipe, "image", "image_variants"),
+            (User, "avatar", "avatar_variants"),
+        ):
+            rows = model.objects.values_list(
+                field_name, variants_field
+            ).iterator()
+            for name, variants in rows:
+                if name:
+                    references[name] += 1
+                references.update(
+                    path for key, path in variants.items() if key != "source"
+                )
+
+        threshold = timezone.now() - timedelta(seconds=options["min_age"])
+        deleted = kept = 0
+        for directory in MEDIA_DIRECTORIES:
+            for name in walk(directory):
+                if references[name]:
+                    kept += 1
+                    continue
+                # Ссылки собраны до обхода файлов, и за это время на файл
+                # могли сослаться снова. Поэтому ссылки проверяются ещё
+                # раз, а время изменения, которое обновляет повторное
+                # сохранение, — последним, прямо перед удалением.
+                if is_referenced(name):
+                    kept += 1
+                    continue
+                if default_storage.get_modified_time(name) > threshold:
+                    continue
+                self.stdout.write(name)
+                if not options["dry_run"]:
+                    default_storage.delete(name)
+                deleted += 1
+        action = "would be deleted" if options["dry_run"] else "deleted"
+        self.stdout.write(
+            f"{kept} referenced files kept, {deleted} orphans {action}"
+        )
@@ -1,26 +1,169 @@
 import csv
-from django.core.management.base import BaseCommand
+import io
+import json
+import time
+from itertools import chain, islice
+from pathlib import Path
 
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from foodgram.cache import bump_catalog_version
 from foodgram.models import Ingredient, Tag
 
 
 models = {
-    "ingredients": Ingredient,
-    "tags": Tag
+    "ingredients": {
+        "model": Ingredient,
+        "fields": ("name", "measurement_unit"),
+        "unique_fields": ("name", "measurement_unit"),
+        "update_fields": (),
+    },
+    "tags": {
+        "model": Tag,
+        "fields": ("name", "slug"),
+        "unique_fields": ("slug",),
+        "update_fields": ("name",),
+    },
+}
+
+
+def read_csv(file):
+    yield from csv.DictReader(file)
+
+
+def read_json(file):
+    """
+    Чтение JSON Lines построчно.
+
+    Файл с JSON-массивом целиком, как data/ingredients.json,
+    тоже поддерживается, но читается в память за раз.
+    """
+    first_line = file.readline()
+    if first_line.lstrip().startswith("["):
+        yield from json.loads(first_line + file.read())
+        return
+    for line in chain([first_line], file):
+        if line.strip():
+            yield json.loads(line)
+
+
+readers = {
+    ".csv": read_csv,
+    ".json": read_json,
+    ".jsonl": read_json,
 }
 
 
 class Command(BaseCommand):
-    help = "Import csv files from data/"
+    help = "Import catalog files (csv, json, jsonl) from data/"
 
     def add_arguments(self, parser):
         parser.add_argument("file_name", nargs=1, type=str)
+        parser.add_argument(
+            "--path",
+            help="File to import instead of data/<file_name>.csv.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=5000,
+            help="Rows per INSERT or COPY batch.",
+        )
+        parser.add_argument(
+            "--update", action="store_true",
+            help="Update existing rows instead of skipping them.",
+        )
+        parser.add_argument(
+            "--no-copy", action="store_true",
+            help="Use bulk_create even on PostgreSQL.",
+        )
 
     def handle(self, **options):
-        search_file = "data/" + options["file_name"][0] + ".csv"
-        model = models[options["file_name"][0]]
+        name = options["file_name"][0]
+        if name not in models:
+            raise CommandError(
+                f"Unknown catalog {name}, expected one of: "
+                f"{', '.join(models)}"
+            )
+        config = models[name]
+        path = Path(options["path"] or f"data/{name}.csv")
+        reader = readers.get(path.suffix)
+        if reader is None:
+            raise CommandError(f"Unsupported file format: {path.suffix}")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        use_copy = connection.vendor == "postgresql" and not options["no_copy"]
+        write_batch = self.copy_batch if use_copy else self.insert_batch
+        model = config["model"]
+        rows_before = model.objects.count()
+        started = time.monotonic()
+        total = 0
+
+        with open(path, encoding="utf-8") as f:
+            rows = (
+                tuple(row[field] for field in config["fields"])
+                for row in reader(f)
+            )
+            while True:
+                batch = list(islice(rows, options["batch_size"]))
+                if not batch:
+                    break
+                with transaction.atomic():
+                    write_batch(config, batch, options["update"])
+                total += len(batch)
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f"{total} rows, "
+                    f"{total / elapsed if elapsed else total:.0f} rows/s"
+                )
+
+        bump_catalog_version(name)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {total} rows from {path} in {elapsed:.2f}s "
+            f"({total / elapsed if elapsed else total:.0f} rows/s), "
+            f"{model.objects.count() - rows_before} new"
+        ))
+
+    def insert_batch(self, config, batch, update):
+        model = config["model"]
+        objects = [model(**dict(zip(config["fields"], row))) for row in batch]
+        if update and config["update_fields"]:
+            model.objects.bulk_create(
+                objects,
+                update_conflicts=True,
+                unique_fields=config["unique_fields"],
+                update_fields=config["update_fields"],
+            )
+        else:
+            model.objects.bulk_create(objects, ignore_conflicts=True)
+
+    def copy_batch(self, config, batch, update):
+        """Загрузка пакета через COPY во временную таблицу."""
+        table = config["model"]._meta.db_table
+        columns = ", ".join(config["fields"])
+        unique = ", ".join(config["unique_fields"])
+        if update and config["update_fields"]:
+            conflict = "DO UPDATE SET " + ", ".join(
+                f"{field} = EXCLUDED.{field}"
+                for field in config["update_fields"]
+            )
+        else:
+            conflict = "DO NOTHING"
 
-        with open(search_file, encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                model.objects.create(**row)
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(batch)
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMP TABLE import_batch ON COMMIT DROP AS "
+                f"SELECT {columns} FROM {table} WITH NO DATA"
+            )
+            cursor.copy_expert(
+                f"COPY import_batch ({columns}) FROM STDIN WITH CSV", buffer
+            )
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) "
+                f"SELECT DISTINCT ON ({unique}) {columns} FROM import_batch "
+                f"ON CONFLICT ({unique}) {conflict}"
+            )
@@ -0,0 +1,76 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from foodgram.datagen import generate_dataset
+
+
+class Command(BaseCommand):
+    help = "Generate synthetic users, recipes and relations with bulk inserts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users", type=int, default=1000,
+            help="Number of users to create.",
+        )
+        parser.add_argument(
+            "--recipes-per-user", type=int, default=5,
+            help="Recipes created by every user.",
+        )
+        parser.add_argument(
+            "--ingredients-per-recipe", type=int, default=8,
+            help="Ingredients in every recipe.",
+        )
+        parser.add_argument(
+            "--tags", type=int, default=8,
+            help="Create tags until there are at least this many.",
+        )
+        parser.add_argument(
+            "--ingredients", type=int, default=500,
+            help="Create ingredients until there are at least this many.",
+        )
+        parser.add_argument(
+            "--follows-per-user", type=int, default=10,
+            help="Subscriptions drawn for every user.",
+        )
+        parser.add_argument(
+            "--favorites-per-user", type=int, default=15,
+            help="Favorites drawn for every user.",
+        )
+        parser.add_argument(
+            "--carts-per-user", type=int, default=5,
+            help="Shopping cart recipes drawn for every user.",
+        )
+        parser.add_argument(
+            "--exponent", type=float, default=1.1,
+            help="Power-law exponent of author and recipe popularity.",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0,
+            help="Random seed, the same seed gives the same dataset.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=2000,
+            help="Number of rows per INSERT.",
+        )
+
+    def handle(self, **options):
+        start = time.perf_counter()
+        created = generate_dataset(
+            options["users"],
+            recipes_per_user=options["recipes_per_user"],
+            ingredients_per_recipe=options["ingredients_per_recipe"],
+            tags=options["tags"],
+            ingredients=options["ingredients"],
+            follows_per_user=options["follows_per_user"],
+            favorites_per_user=options["favorites_per_user"],
+            carts_per_user=options["carts_per_user"],
+            exponent=options["exponent"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+        )
+        for name, count in created.items():
+            self.stdout.write(f"{name}: {count}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Done in {time.perf_counter() - start:.1f}s"
+        ))
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+
+from foodgram.images import create_image_variants
+from foodgram.models import Recipe
+from users.models import User
+
+targets = (
+    (Recipe, "image", "image_variants"),
+    (User, "avatar", "avatar_variants"),
+)
+
+
+class Command(BaseCommand):
+    help = "Generate thumbnails and WebP variants for recipes and avatars"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all", action="store_true",
+            help="Regenerate variants that already exist.",
+        )
+
+    def handle(self, **options):
+        for model, field_name, variants_field in targets:
+            rows = (
+                model.objects.exclude(**{field_name: ""})
+                .exclude(**{f"{field_name}__isnull": True})
+                .values_list("pk", field_name, variants_field)
+                .iterator()
+            )
+            done = failed = 0
+            for pk, name, variants in rows:
+                if not options["all"] and variants.get("source") == name:
+                    continue
+                try:
+                    variants = create_image_variants(name)
+                except Exception as error:
+                    failed += 1
+                    self.stderr.write(f"{name}: {error}")
+                    continue
+                model.objects.filter(pk=pk).update(
+                    **{variants_field: variants}
+                )
+                done += 1
+            self.stdout.write(
+                f"{model._meta.verbose_name_plural}: {done} generated, "
+                f"{failed} failed"
+            )
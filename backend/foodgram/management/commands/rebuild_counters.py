@@ -0,0 +1,67 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import F, Max, Q
+
+from foodgram.counters import counter_expressions
+
+
+class Command(BaseCommand):
+    help = "Rebuild or verify denormalized recipe and user counters"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify", action="store_true",
+            help="Only report rows with wrong counters.",
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=10000,
+            help="Primary key range processed by one UPDATE.",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=4,
+            help="Number of chunks processed in parallel.",
+        )
+
+    def handle(self, **options):
+        for model, expressions in counter_expressions().items():
+            max_pk = model.objects.aggregate(max_pk=Max("pk"))["max_pk"] or 0
+            chunks = [
+                (start, start + options["chunk_size"] - 1)
+                for start in range(1, max_pk + 1, options["chunk_size"])
+            ]
+            process = self.verify_chunk if options["verify"] else (
+                self.rebuild_chunk
+            )
+            with ThreadPoolExecutor(max(options["workers"], 1)) as executor:
+                total = sum(executor.map(
+                    lambda chunk: process(model, expressions, chunk), chunks
+                ))
+            action = "wrong" if options["verify"] else "updated"
+            self.stdout.write(
+                f"{model._meta.verbose_name_plural}: {total} rows {action}"
+            )
+
+    def rebuild_chunk(self, model, expressions, chunk):
+        try:
+            return model.objects.filter(pk__range=chunk).update(**expressions)
+        finally:
+            connections.close_all()
+
+    def verify_chunk(self, model, expressions, chunk):
+        mismatch = Q()
+        for field in expressions:
+            mismatch |= ~Q(**{field: F(f"actual_{field}")})
+        try:
+            return (
+                model.objects.filter(pk__range=chunk)
+                .annotate(**{
+                    f"actual_{field}": expression
+                    for field, expression in expressions.items()
+                })
+                .filter(mismatch)
+                .count()
+            )
+        finally:
+            connections.close_all()
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.13 on 2026-10-17 05:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodgram', '0003_shoppingcartexport'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipe',
+            name='short_url',
+            field=models.CharField(blank=True, editable=False, max_length=12, verbose_name='Короткая ссылка'),
+        ),
+    ]
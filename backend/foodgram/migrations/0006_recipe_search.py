@@ -0,0 +1,54 @@
+from django.db import migrations
+
+
+POSTGRESQL_FORWARD = [
+    """
+    ALTER TABLE foodgram_recipe ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('russian'::regconfig, coalesce(name, '')), 'A')
+        || setweight(to_tsvector('russian'::regconfig, coalesce(text, '')), 'B')
+    ) STORED
+    """,
+    """
+    CREATE INDEX foodgram_recipe_search_vector_idx
+    ON foodgram_recipe USING GIN (search_vector)
+    """,
+]
+POSTGRESQL_BACKWARD = [
+    "DROP INDEX IF EXISTS foodgram_recipe_search_vector_idx",
+    "ALTER TABLE foodgram_recipe DROP COLUMN IF EXISTS search_vector",
+]
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS foodgram_recipe_fts
+    USING fts5(name, text, tokenize='unicode61 remove_diacritics 2')
+    """,
+    """
+    INSERT INTO foodgram_recipe_fts (rowid, name, text)
+    SELECT id, name, text FROM foodgram_recipe
+    """,
+]
+SQLITE_BACKWARD = [
+    "DROP TABLE IF EXISTS foodgram_recipe_fts",
+]
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodgram', '0005_recipe_created_at_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({"postgresql": POSTGRESQL_FORWARD, "sqlite": SQLITE_FORWARD}),
+            run({"postgresql": POSTGRESQL_BACKWARD, "sqlite": SQLITE_BACKWARD}),
+        ),
+    ]
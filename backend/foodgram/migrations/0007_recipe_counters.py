@@ -0,0 +1,56 @@
+# Generated by Django 4.2.13 on 2026-10-17 06:01
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(count=Count("pk"))
+            .values("count")
+        ),
+        0,
+    )
+
+
+def fill_counters(apps, schema_editor):
+    Recipe = apps.get_model("foodgram", "Recipe")
+    Favorite = apps.get_model("foodgram", "Favorite")
+    ShoppingCart = apps.get_model("foodgram", "ShoppingCart")
+    User = apps.get_model("users", "User")
+    Subscriptions = apps.get_model("users", "Subscriptions")
+    Recipe.objects.update(
+        favorites_count=count(Favorite, "recipe"),
+        shopping_carts_count=count(ShoppingCart, "recipe"),
+    )
+    User.objects.update(
+        recipes_count=count(Recipe, "author"),
+        followers_count=count(Subscriptions, "following"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodgram', '0006_recipe_search'),
+        ('users', '0004_user_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Сколько пользователей добавили рецепт в избранное', verbose_name='В избранном'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='shopping_carts_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Сколько пользователей добавили рецепт в список покупок', verbose_name='В списках покупок'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
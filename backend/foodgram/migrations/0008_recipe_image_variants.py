@@ -0,0 +1,18 @@
+# Generated by Django 4.2.13 on 2026-10-17 06:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodgram', '0007_recipe_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='image_variants',
+            field=models.JSONField(default=dict, editable=False, help_text='Пути к уменьшенным копиям фотографии', verbose_name='Миниатюры'),
+        ),
+    ]
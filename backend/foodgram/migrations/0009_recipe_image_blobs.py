@@ -0,0 +1,19 @@
+# Generated by Django 4.2.13 on 2026-10-17 06:04
+
+from django.db import migrations, models
+import foodgram.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodgram', '0008_recipe_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipe',
+            name='image',
+            field=models.ImageField(help_text='Фотография блюда', storage=foodgram.storage.ContentAddressedStorage(), upload_to='foodgram/blobs/', verbose_name='Изображение'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.13 on 2026-10-17 07:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodgram', '0010_recipe_author_ingredient_recipe_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ingredient',
+            name='measurement_unit',
+            field=models.CharField(help_text='Единица измерения, не более             64 символов', max_length=64, verbose_name='Единица измерения'),
+        ),
+        migrations.AlterField(
+            model_name='tag',
+            name='name',
+            field=models.CharField(help_text='Имя тега, не более 32 символов', max_length=32, verbose_name='Название'),
+        ),
+        migrations.AlterField(
+            model_name='tag',
+            name='slug',
+            field=models.SlugField(help_text='Слаг тега, не более 32 символов', max_length=32, unique=True, verbose_name='Слаг'),
+        ),
+    ]
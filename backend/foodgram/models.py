@@ -1,8 +1,8 @@
 from django.db import models
+from django.db.models import BooleanField, Exists, OuterRef, Prefetch, Value
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.utils.crypto import get_random_string
 
-from users.models import User
+from users.models import User, Subscriptions
 from backend.constants import (
     INGREDIENT_NAME_FIELD_MAX_LENGTH,
     TAG_FIELD_MAX_LENGTH,
@@ -12,9 +12,11 @@ from backend.constants import (
     MIN_VALUE_VALIDATOR_AMOUNT,
     MAX_VALUE_VALIDATOR_AMOUNT,
     SHORT_URL_MAX_LENGTH,
-    LENGTH_STRING_FOR_SHORT_LINK,
+    EXPORT_STATUS_MAX_LENGTH,
     MEANSUREMENT_UNIT_MAX_LENGTH,
 )
+from .short_links import encode_short_code
+from .storage import ContentAddressedStorage
 
 
 class Ingredient(models.Model):
@@ -68,6 +70,54 @@ class Tag(models.Model):
         return self.name
 
 
+class RecipeQuerySet(models.QuerySet):
+    def with_related(self, user):
+        """
+        Подгрузка связанных данных и флагов текущего пользователя.
+
+        Автор, теги и ингредиенты загружаются отдельными запросами
+        сразу для всех рецептов, а флаги избранного, списка покупок
+        и подписки на автора вычисляются подзапросами, поэтому число
+        запросов не зависит от количества рецептов.
+        """
+        authors = User.objects.all()
+        if user.is_authenticated:
+            authors = authors.annotate(
+                is_subscribed=Exists(
+                    Subscriptions.objects.filter(
+                        user=user, following=OuterRef("pk")
+                    )
+                )
+            )
+            is_favorited = Exists(
+                Favorite.objects.filter(user=user, recipe=OuterRef("pk"))
+            )
+            is_in_shopping_cart = Exists(
+                ShoppingCart.objects.filter(user=user, recipe=OuterRef("pk"))
+            )
+        else:
+            authors = authors.annotate(
+                is_subscribed=Value(False, output_field=BooleanField())
+            )
+            is_favorited = is_in_shopping_cart = Value(
+                False, output_field=BooleanField()
+            )
+
+        return self.prefetch_related(
+            Prefetch("author", queryset=authors),
+            "tags",
+            Prefetch(
+                "recipes",
+                queryset=RecipeIngredient.objects.select_related(
+                    "ingredients"
+                ),
+            ),
+        ).annotate(
+            is_favorited=is_favorited,
+            is_in_shopping_cart=is_in_shopping_cart,
+        )
+
+
 class Recipe(models.Model):
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, verbose_name="Автор"
@@ -79,10 +129,17 @@ class Recipe(models.Model):
             {RECIPE_FIELD_MAX_LENGTH} символов",
     )
     image = models.ImageField(
-        upload_to="foodgram/recipe/",
+        upload_to="foodgram/blobs/",
+        storage=ContentAddressedStorage(),
         verbose_name="Изображение",
         help_text="Фотография блюда",
     )
+    image_variants = models.JSONField(
+        "Миниатюры",
+        default=dict,
+        editable=False,
+        help_text="Пути к уменьшенным копиям фотографии",
+    )
     text = models.TextField("Описание", help_text="Описание блюда")
     ingredients = models.ManyToManyField(
         Ingredient,
@@ -112,30 +169,47 @@ class Recipe(models.Model):
         ],
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    favorites_count = models.PositiveIntegerField(
+        "В избранном", default=0, editable=False,
+        help_text="Сколько пользователей добавили рецепт в избранное",
+    )
+    shopping_carts_count = models.PositiveIntegerField(
+        "В списках покупок", default=0, editable=False,
+        help_text="Сколько пользователей добавили рецепт в список покупок",
+    )
     short_url = models.CharField(
-        "Короткая ссылка", max_length=SHORT_URL_MAX_LENGTH
+        "Короткая ссылка",
+        max_length=SHORT_URL_MAX_LENGTH,
+        blank=True,
+        editable=False,
     )
 
+    objects = RecipeQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
         default_related_name = "recipes"
+        indexes = [
+            models.Index(
+                fields=["-created_at", "-id"],
+                name="recipe_created_at_id_idx",
+            ),
+            models.Index(
+                fields=["author", "-created_at", "-id"],
+                name="recipe_author_created_at_idx",
+            ),
+        ]
         verbose_name = "Рецепт"
         verbose_name_plural = "рецепты"
 
     def __str__(self):
         return self.name
 
-    def create_unique_short_link(self):
-        unique_url = get_random_string(length=LENGTH_STRING_FOR_SHORT_LINK)
-
-        if not Recipe.objects.filter(short_url=unique_url).exists():
-            return unique_url
-        else:
-            self.create_unique_short_link()
-
     def save(self, *args, **kwargs):
-        self.short_url = f"/{self.create_unique_short_link()}/"
         super().save(*args, **kwargs)
+        if not self.short_url:
+            self.short_url = f"/{encode_short_code(self.pk)}/"
+            Recipe.objects.filter(pk=self.pk).update(short_url=self.short_url)
 
 
 class RecipeIngredient(models.Model):
@@ -177,6 +251,12 @@ class RecipeIngredient(models.Model):
                 name="unique_recipe_ingredients"
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["ingredients", "recipe"],
+                name="ingredient_recipe_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.recipe} {self.ingredients}"
@@ -225,3 +305,54 @@ class ShoppingCart(DefaultRecipeAction):
                 fields=["user", "recipe"], name="user_recipe_shopping_carts"
             ),
         ]
+
+
+class ShoppingCartExport(models.Model):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (PENDING, "В очереди"),
+        (RUNNING, "Выполняется"),
+        (DONE, "Готово"),
+        (FAILED, "Ошибка"),
+    )
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="shopping_cart_exports",
+        verbose_name="Пользователь",
+        help_text="Пользователь, запросивший выгрузку.",
+    )
+    status = models.CharField(
+        "Статус",
+        max_length=EXPORT_STATUS_MAX_LENGTH,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+    )
+    file = models.FileField(
+        "Файл",
+        upload_to="foodgram/exports/",
+        blank=True,
+        help_text="Готовый PDF со списком покупок",
+    )
+    error = models.TextField("Ошибка", blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        verbose_name = "Выгрузка списка покупок"
+        verbose_name_plural = "выгрузки списков покупок"
+        indexes = [
+            models.Index(
+                fields=["status", "created_at"],
+                name="export_status_created_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.status}"
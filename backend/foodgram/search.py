@@ -0,0 +1,101 @@
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+SQLITE_FTS_TABLE = "foodgram_recipe_fts"
+
+
+def _sqlite_match_expression(query):
+    """Запрос FTS5: все слова запроса как префиксы, в кавычках."""
+    words = re.findall(r"\w+", query.lower())
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_recipes(queryset, query):
+    """
+    Полнотекстовый поиск рецептов по названию и описанию.
+
+    На PostgreSQL используется столбец search_vector с GIN-индексом
+    (русская конфигурация), на SQLite — таблица FTS5. Результаты
+    аннотируются search_rank и сортируются по убыванию релевантности.
+    """
+    if connection.vendor == "postgresql":
+        ts_query = "websearch_to_tsquery('russian', %s)"
+        # Условие на столбец самой таблицы рецептов, а не pk IN
+        # (подзапрос): планировщик сочетает GIN-индекс с остальными
+        # фильтрами ленты.
+        matches = RawSQL(
+            f'"foodgram_recipe"."search_vector" @@ {ts_query}',
+            (query,),
+            output_field=BooleanField(),
+        )
+        rank = RawSQL(
+            f'ts_rank("foodgram_recipe"."search_vector", {ts_query})',
+            (query,),
+            output_field=FloatField(),
+        )
+    else:
+        expression = _sqlite_match_expression(query)
+        if not expression:
+            return queryset.none()
+        matches = Q(pk__in=RawSQL(
+            f"SELECT rowid FROM {SQLITE_FTS_TABLE} "
+            f"WHERE {SQLITE_FTS_TABLE} MATCH %s",
+            (expression,),
+        ))
+        rank = RawSQL(
+            f"SELECT -bm25({SQLITE_FTS_TABLE}, 10.0, 1.0) "
+            f"FROM {SQLITE_FTS_TABLE} WHERE {SQLITE_FTS_TABLE} MATCH %s "
+            f'AND rowid = "foodgram_recipe"."id"',
+            (expression,),
+            output_field=FloatField(),
+        )
+    return (
+        queryset.filter(matches)
+        .annotate(search_rank=rank)
+        .order_by("-search_rank", "-created_at")
+    )
+
+
+def index_recipe(recipe):
+    """
+    Обновление записи рецепта в таблице FTS5.
+
+    На PostgreSQL search_vector — генерируемый столбец и обновляется
+    самой базой, поэтому ничего делать не нужно.
+    """
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {SQLITE_FTS_TABLE} WHERE rowid = %s", (recipe.pk,)
+        )
+        cursor.execute(
+            f"INSERT INTO {SQLITE_FTS_TABLE} (rowid, name, text) "
+            "VALUES (%s, %s, %s)",
+            (recipe.pk, recipe.name, recipe.text),
+        )
+
+
+def index_recipes(recipes):
+    """Добавление в таблицу FTS5 рецептов, созданных через bulk_create."""
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {SQLITE_FTS_TABLE} (rowid, name, text) "
+            "VALUES (%s, %s, %s)",
+            [(recipe.pk, recipe.name, recipe.text) for recipe in recipes],
+        )
+
+
+def unindex_recipe(recipe):
+    """Удаление рецепта из таблицы FTS5."""
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {SQLITE_FTS_TABLE} WHERE rowid = %s", (recipe.pk,)
+        )
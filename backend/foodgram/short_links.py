@@ -0,0 +1,87 @@
+import string
+
+from django.conf import settings
+from django.core.cache import cache
+
+from backend.constants import (
+    LENGTH_STRING_FOR_SHORT_LINK,
+    SHORT_LINK_LEGACY_CACHE_TIMEOUT,
+)
+
+ALPHABET = string.digits + string.ascii_letters
+BASE = len(ALPHABET)
+SPACE = BASE ** LENGTH_STRING_FOR_SHORT_LINK
+LEGACY_CODE_KEY = "short-link-legacy:{}"
+
+
+def _multiplier():
+    """Множитель, взаимно простой с размером пространства кодов."""
+    multiplier = int(settings.SHORT_LINK_KEY) % SPACE | 1
+    while multiplier % 31 == 0:
+        multiplier += 2
+    return multiplier
+
+
+def encode_short_code(pk):
+    """
+    Короткий код рецепта по его первичному ключу.
+
+    Ключ умножается по модулю 62 ** LENGTH_STRING_FOR_SHORT_LINK на
+    секретный множитель, поэтому соседние рецепты получают непохожие
+    коды, а код однозначно переводится обратно без обращения к базе.
+    """
+    value = pk * _multiplier() % SPACE
+    code = []
+    for _ in range(LENGTH_STRING_FOR_SHORT_LINK):
+        value, digit = divmod(value, BASE)
+        code.append(ALPHABET[digit])
+    return "".join(reversed(code))
+
+
+def decode_short_code(code):
+    """Первичный ключ рецепта по короткому коду или None."""
+    if len(code) != LENGTH_STRING_FOR_SHORT_LINK:
+        return None
+    value = 0
+    for char in code:
+        digit = ALPHABET.find(char)
+        if digit < 0:
+            return None
+        value = value * BASE + digit
+    pk = value * pow(_multiplier(), -1, SPACE) % SPACE
+    return pk or None
+
+
+def _resolve_legacy_short_code(code):
+    from foodgram.models import Recipe
+
+    key = LEGACY_CODE_KEY.format(code)
+    pk = cache.get(key)
+    if pk is None:
+        pk = (
+            Recipe.objects.filter(short_url=f"/{code}/")
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if pk is not None:
+            cache.set(key, pk, SHORT_LINK_LEGACY_CACHE_TIMEOUT)
+    return pk
+
+
+def forget_legacy_short_code(short_url):
+    """Удаление кода рецепта из кэша старых ссылок."""
+    cache.delete(LEGACY_CODE_KEY.format(short_url.strip("/")))
+
+
+def resolve_short_code(code):
+    """
+    Первичный ключ рецепта по коду из короткой ссылки.
+
+    Ссылки, выданные до перехода на коды из первичного ключа,
+    ищутся в базе. Найденные рецепты запоминаются в общем кэше
+    и удаляются из него вместе с рецептом, промахи не кэшируются.
+    """
+    pk = decode_short_code(code)
+    if pk is None:
+        pk = _resolve_legacy_short_code(code)
+    return pk
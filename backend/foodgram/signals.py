@@ -0,0 +1,101 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.models import User
+from .autocomplete import ingredient_index
+from .cache import (
+    bump_catalog_version,
+    bump_recipe_shopping_carts,
+    bump_shopping_cart_versions,
+)
+from .counters import change_counter
+from .images import schedule_image_variants
+from .models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+    Tag,
+)
+from .search import index_recipe, unindex_recipe
+from .short_links import forget_legacy_short_code
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def bump_ingredients_version(**kwargs):
+    """Смена версии справочника ингредиентов."""
+    bump_catalog_version("ingredients")
+    transaction.on_commit(ingredient_index.invalidate)
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def bump_tags_version(**kwargs):
+    """Смена версии справочника тегов."""
+    bump_catalog_version("tags")
+
+
+@receiver((post_save, post_delete), sender=ShoppingCart)
+def bump_shopping_cart_version(instance, **kwargs):
+    """Смена версии списка покупок пользователя."""
+    transaction.on_commit(
+        lambda: bump_shopping_cart_versions([instance.user_id])
+    )
+
+
+@receiver((post_save, post_delete), sender=RecipeIngredient)
+def bump_recipe_ingredients_version(instance, **kwargs):
+    """Смена версий списков покупок, содержащих изменённый рецепт."""
+    transaction.on_commit(
+        lambda: bump_recipe_shopping_carts(instance.recipe_id)
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def update_recipe_search_index(instance, **kwargs):
+    """Обновление полнотекстового индекса рецепта."""
+    index_recipe(instance)
+
+
+@receiver(post_delete, sender=Recipe)
+def delete_recipe_search_index(instance, **kwargs):
+    """Удаление рецепта из полнотекстового индекса."""
+    unindex_recipe(instance)
+
+
+@receiver(post_delete, sender=Recipe)
+def forget_recipe_short_link(instance, **kwargs):
+    """Удаление старой короткой ссылки рецепта из кэша."""
+    short_url = instance.short_url
+    transaction.on_commit(lambda: forget_legacy_short_code(short_url))
+
+
+@receiver((post_save, post_delete), sender=Favorite)
+@receiver((post_save, post_delete), sender=ShoppingCart)
+def update_recipe_counters(sender, instance, signal, created=False, **kwargs):
+    """Изменение счётчиков избранного и списков покупок у рецепта."""
+    if signal is post_save and not created:
+        return
+    field = (
+        "favorites_count" if sender is Favorite else "shopping_carts_count"
+    )
+    change_counter(
+        Recipe, instance.recipe_id, field, 1 if created else -1
+    )
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+def update_author_recipes_count(instance, signal, created=False, **kwargs):
+    """Изменение счётчика рецептов автора."""
+    if signal is post_save and not created:
+        return
+    change_counter(
+        User, instance.author_id, "recipes_count", 1 if created else -1
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def create_recipe_image_variants(instance, **kwargs):
+    """Создание миниатюр фотографии рецепта."""
+    schedule_image_variants(instance, "image", "image_variants")
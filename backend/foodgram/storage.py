@@ -0,0 +1,45 @@
+import hashlib
+import os
+import posixpath
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Хранилище, называющее файлы по SHA-256 их содержимого.
+
+    Одинаковые файлы получают одно имя и хранятся один раз, а раз
+    содержимое файла с данным именем не меняется, его можно кэшировать
+    навсегда. Файлы не удаляются при смене ссылок на них — для этого
+    есть команда collect_media_garbage. Повторное сохранение
+    существующего файла обновляет время его изменения, чтобы сборщик
+    не удалил файл, на который только что сослались.
+    """
+
+    def save(self, name, content, max_length=None):
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        content_hash = digest.hexdigest()
+        name = posixpath.join(
+            posixpath.dirname(name),
+            content_hash[:2],
+            content_hash + posixpath.splitext(name)[1].lower(),
+        )
+        try:
+            os.utime(self.path(name))
+            return name
+        except FileNotFoundError:
+            pass
+        saved_name = super().save(name, content, max_length)
+        if saved_name != name:
+            # Тот же файл успел сохранить параллельный запрос.
+            self.delete(saved_name)
+        return name
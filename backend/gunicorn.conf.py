@@ -0,0 +1,23 @@
+import os
+import shutil
+
+bind = "0.0.0.0:8000"
+
+# Каталог задаётся до загрузки приложения, чтобы prometheus_client
+# в воркерах сразу писал метрики в общие файлы.
+metrics_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", "/tmp/foodgram-metrics"
+)
+
+
+def on_starting(server):
+    """Очистка метрик прошлого запуска."""
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
+
+
+def child_exit(server, worker):
+    """Удаление значений gauge завершившегося воркера."""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.13 on 2026-10-17 06:00
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_alter_user_email'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='first_name',
+            field=models.CharField(help_text='Имя пользователя, не более             150 символов', max_length=150, verbose_name='Имя'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='last_name',
+            field=models.CharField(help_text='Фамилия пользователя, не более             150 символов', max_length=150, verbose_name='Фамилия'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='username',
+            field=models.CharField(help_text='Юзернейм пользователя, не более             150 символов', max_length=150, validators=[django.core.validators.RegexValidator(message='Юзернейм не подходит.', regex='^[\\w.@+-]+$')], verbose_name='Юзернейм'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-date_joined', '-id'], name='user_date_joined_id_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.13 on 2026-10-17 06:04
+
+from django.db import migrations, models
+import foodgram.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_user_avatar_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='avatar',
+            field=models.ImageField(default=None, null=True, storage=foodgram.storage.ContentAddressedStorage(), upload_to='foodgram/blobs/', verbose_name='Аватар'),
+        ),
+    ]
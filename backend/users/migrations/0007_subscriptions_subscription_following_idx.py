@@ -0,0 +1,17 @@
+# Generated by Django 4.2.13 on 2026-10-17 06:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_user_avatar_blobs'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscriptions',
+            index=models.Index(fields=['following', 'user'], name='subscription_following_idx'),
+        ),
+    ]
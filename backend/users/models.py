@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator
 
+from foodgram.storage import ContentAddressedStorage
 from backend.constants import (
     USER_NAME_FIELD_MAX_LENGTH,
     EMAIL_FIELD_MAX_LENGTH
@@ -22,10 +23,17 @@ class User(AbstractUser):
     )
     avatar = models.ImageField(
         "Аватар",
-        upload_to="foodgram/avatar/",
+        upload_to="foodgram/blobs/",
+        storage=ContentAddressedStorage(),
         null=True,
         default=None
     )
+    avatar_variants = models.JSONField(
+        "Миниатюры аватара",
+        default=dict,
+        editable=False,
+        help_text="Пути к уменьшенным копиям аватара",
+    )
     email = models.EmailField(
         "Электронная почта", unique=True,
         max_length=EMAIL_FIELD_MAX_LENGTH,
@@ -44,18 +52,47 @@ class User(AbstractUser):
         help_text=f"Юзернейм пользователя, не более \
             {USER_NAME_FIELD_MAX_LENGTH} символов",
     )
+    recipes_count = models.PositiveIntegerField(
+        "Рецептов", default=0, editable=False,
+        help_text="Количество рецептов пользователя",
+    )
+    followers_count = models.PositiveIntegerField(
+        "Подписчиков", default=0, editable=False,
+        help_text="Количество подписчиков пользователя",
+    )
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["last_name", "first_name", "username"]
+    # Счётчики меняются только F()-выражениями, а request.user может
+    # быть копией из кэша токенов, поэтому полное сохранение
+    # существующего пользователя их не перезаписывает.
+    COUNTER_FIELDS = ("recipes_count", "followers_count")
 
     class Meta:
         verbose_name = "пользователь"
         verbose_name_plural = "пользователи"
         ordering = ["-date_joined", "username"]
+        indexes = [
+            models.Index(
+                fields=["-date_joined", "-id"],
+                name="user_date_joined_id_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.username
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COUNTER_FIELDS
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
 
 class Subscriptions(models.Model):
     user = models.ForeignKey(
@@ -82,6 +119,12 @@ class Subscriptions(models.Model):
                 check=~models.Q(user=models.F("following")),
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=["following", "user"],
+                name="subscription_following_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user} {self.following}"
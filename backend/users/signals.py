@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from foodgram.counters import change_counter
+from foodgram.images import schedule_image_variants
+from .models import Subscriptions, User
+
+
+@receiver((post_save, post_delete), sender=Subscriptions)
+def update_followers_count(instance, signal, created=False, **kwargs):
+    """Изменение счётчика подписчиков пользователя."""
+    if signal is post_save and not created:
+        return
+    change_counter(
+        User, instance.following_id, "followers_count", 1 if created else -1
+    )
+
+
+@receiver(post_save, sender=User)
+def create_avatar_variants(instance, **kwargs):
+    """Создание миниатюр аватара."""
+    schedule_image_variants(instance, "avatar", "avatar_variants")